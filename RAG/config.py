@@ -12,6 +12,13 @@ GEMINI_EMBEDDING_MODEL = "models/text-embedding-004"
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 150
 MAX_TOKENS = 1500
+CONTEXT_BUDGET_TOKENS = 6000  # Retrieved context sent with each question
+CHARS_PER_TOKEN = 4  # Rough estimate used to apply the context budget
+EMBEDDING_BATCH_SIZE = 100  # Chunks per embed_content request
+CHROMA_ADD_BATCH_SIZE = 200  # Chunks per Chroma insert (50-250 works well)
+EMBEDDING_MAX_WORKERS = 4  # Embedding requests in flight at once
+EMBEDDING_MAX_RETRIES = 5  # Attempts per request when rate limited
+GEMINI_MAX_CONNECTIONS = 32  # Keep-alive HTTP connections to the Gemini API
 TEMPERATURE = 0.7  # 0.1 -- 1.0
 
 # ChromaDB Vector Database
@@ -19,14 +26,57 @@ COLLECTION_NAME = "rag_documents"
 SIMILARITY_SEARCH_RESULTS = 3
 DISTANCE_FUNCTION = "cosine"
 
+# Optional cross-encoder reranking (requires sentence-transformers)
+RERANKER_ENABLED = False
+RERANKER_MODEL = "BAAI/bge-reranker-v2-m3"
+RERANKER_OVERSAMPLE = 10  # Candidates fetched per final result
+
+# Maximal marginal relevance: trade relevance (1.0) against diversity (0.0)
+MMR_ENABLED = False
+MMR_LAMBDA = 0.5
+MMR_FETCH_K = 20  # Candidates the diversified results are chosen from
+
+# HNSW index tuning (applied when the collection is created)
+HNSW_M = 16
+HNSW_CONSTRUCTION_EF = 200
+HNSW_SEARCH_EF = 64
+
+# Minimum seconds between progress bar updates during ingestion
+PROGRESS_UPDATE_INTERVAL = 0.25
+
+# In-process caches
+EMBEDDING_CACHE_SIZE = 4096
+RESPONSE_CACHE_SIZE = 256
+
+# Semantic query cache: near-duplicate questions reuse earlier search results
+SEMANTIC_CACHE_THRESHOLD = 0.97  # Minimum cosine similarity for a hit
+SEMANTIC_CACHE_TTL = 300  # seconds
+SEMANTIC_CACHE_SIZE = 2000
+
+# Extracted document text, memoized across Streamlit reruns
+EXTRACTION_CACHE_ENTRIES = 32
+WEBSITE_CACHE_TTL = 3600  # seconds
+
+# PDFs up to this many pages are extracted in-process; larger ones use a
+# process pool, whose start-up only pays off on bigger documents
+PDF_INPROCESS_MAX_PAGES = 8
+
+# On-disk embedding cache (survives Streamlit reloads)
+EMBEDDING_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "rag_pipeline", "embeddings.sqlite"
+)
+
 # Web search
 SERPER_API_URL = "https://google.serper.dev/search"
 DEFAULT_SEARCH_RESULTS = 5
+WEB_SEARCH_TIMEOUT = (3, 10)  # (connect, read) seconds
+WEB_SEARCH_CACHE_TTL = 600  # seconds
 
 # Headers for web scraping
 WEB_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
+MAX_CONCURRENT_FETCHES = 10
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
@@ -1,9 +1,63 @@
-import PyPDF2
-import requests
+import asyncio
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aiohttp
+import numpy as np
+import pypdfium2 as pdfium
 from bs4 import BeautifulSoup
 import streamlit as st
 from typing import List, Optional, Tuple
-from config import CHUNK_SIZE, CHUNK_OVERLAP, WEB_HEADERS
+from config import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    WEB_HEADERS,
+    MAX_CONCURRENT_FETCHES,
+    EXTRACTION_CACHE_ENTRIES,
+    WEBSITE_CACHE_TTL,
+    PDF_INPROCESS_MAX_PAGES,
+)
+
+
+# Page elements that never hold main content
+_UNWANTED_TAGS_SELECTOR = "script, style, nav, footer, header, aside"
+
+# Any whitespace run collapses to a single space in scraped text
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Successful website extractions: url -> (fetch time, (text, title)). Shared
+# across sessions like st.cache_data, but failures are never stored
+_website_cache = OrderedDict()
+_website_cache_lock = threading.Lock()
+
+# Per-worker PDF handle, opened once by the pool initializer
+_worker_doc = None
+
+
+def _open_worker_pdf(filename: str) -> None:
+    """Open the PDF once per worker process (PDFium documents can't be pickled)"""
+    global _worker_doc
+    _worker_doc = pdfium.PdfDocument(filename)
+
+
+def _page_text(doc: pdfium.PdfDocument, page_index: int) -> str:
+    page = doc[page_index]
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_range()
+    finally:
+        textpage.close()
+        page.close()
+
+
+def _extract_page(page_index: int) -> str:
+    """Extract the text of a single PDF page (runs in a worker process)"""
+    return _page_text(_worker_doc, page_index)
 
 
 class DocumentProcessor:
@@ -22,86 +76,137 @@ class DocumentProcessor:
         if not text or not text.strip():
             return []
 
-        chunks = []
-        start = 0
+        # Compute every (start, end) window up front instead of stepping in a loop
+        n = len(text)
+        starts = np.arange(0, n, chunk_size - overlap, dtype=np.int64)
+        ends = np.minimum(starts + chunk_size, n)
 
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
+        chunks = [text[s:e].strip() for s, e in zip(starts.tolist(), ends.tolist())]
 
-            # Only add non-empty chunks
-            if chunk.strip():
-                chunks.append(chunk.strip())
+        # Only keep non-empty chunks
+        chunks = [chunk for chunk in chunks if chunk]
 
-            start = end - overlap
+        return chunks
 
-            if start >= len(text):
-                break
+    @staticmethod
+    def extract_pdf_text(pdf_bytes: bytes, name: str) -> Optional[str]:
+        try:
+            return DocumentProcessor._extract_pdf_text(pdf_bytes, name)
 
-        return chunks
+        except Exception as e:
+            st.error(f"Error extracting PDF text: {str(e)}")
+            return None
 
     @staticmethod
-    def extract_pdf_text(pdf_file) -> Optional[str]:
+    @st.cache_data(max_entries=EXTRACTION_CACHE_ENTRIES, show_spinner=False)
+    def _extract_pdf_text(pdf_bytes: bytes, name: str) -> Optional[str]:
+        """Re-uploads of the same PDF reuse the earlier text; errors raise so
+        a failed extraction is never cached"""
+        tmp_path = None
         try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            total_pages = len(pdf_reader.pages)
+            doc = pdfium.PdfDocument(pdf_bytes)
+            try:
+                total_pages = len(doc)
+
+                # Small documents are read right here; starting worker
+                # processes would cost more than the extraction itself
+                if total_pages <= PDF_INPROCESS_MAX_PAGES:
+                    pages_out = [_page_text(doc, i) for i in range(total_pages)]
+            finally:
+                doc.close()
 
             if total_pages == 0:
-                st.warning("PDF file appears to be empty")
+                st.warning(f"PDF file {name} appears to be empty")
                 return None
 
-            progress_bar = st.progress(0)
+            if total_pages > PDF_INPROCESS_MAX_PAGES:
+                # Workers open the PDF by path, so persist the upload to disk
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                    tmp.write(pdf_bytes)
+                    tmp_path = tmp.name
 
-            for i, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-                progress_bar.progress((i + 1) / total_pages)
+                # PDFium isn't thread-safe, so pages are decoded in a bounded
+                # process pool and reassembled in page order as they complete
+                max_workers = min(8, os.cpu_count() or 1, total_pages)
+                pages_out = [""] * total_pages
 
-            progress_bar.empty()
+                progress_bar = st.progress(0)
+                # Each update is a websocket round-trip, so send at most ~100
+                progress_step = max(1, total_pages // 100)
+
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_open_worker_pdf,
+                    initargs=(tmp_path,),
+                ) as ex:
+                    futures = {
+                        ex.submit(_extract_page, i): i for i in range(total_pages)
+                    }
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        pages_out[futures[future]] = future.result()
+                        if done % progress_step == 0 or done == total_pages:
+                            progress_bar.progress(done / total_pages)
+
+                progress_bar.empty()
+
+            # Join once at the end, skipping pages without any text
+            text = "\n".join(page_text for page_text in pages_out if page_text)
 
             if not text.strip():
-                st.warning("No text could be extracted from PDF")
+                st.warning(f"No text could be extracted from {name}")
                 return None
 
             return text.strip()
 
-        except Exception as e:
-            st.error(f"Error extracting PDF text: {str(e)}")
-            return None
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
 
     @staticmethod
-    def extract_website_content(url: str) -> Optional[Tuple[str, str]]:
-        try:
-            if not url.startswith(("http://", "https://")):
-                url = "https://" + url
+    def _parse_html(content: bytes) -> Tuple[str, str]:
+        """Parse raw HTML into (cleaned_text, title)"""
+        soup = BeautifulSoup(content, "lxml")
 
-            response = requests.get(url, headers=WEB_HEADERS, timeout=15)
-            response.raise_for_status()
+        # Remove unwanted elements in a single tree walk
+        for element in soup.select(_UNWANTED_TAGS_SELECTOR):
+            element.decompose()
 
-            soup = BeautifulSoup(response.content, "html.parser")
+        title = soup.title.string.strip() if soup.title else "Website Content"
 
-            # Remove unwanted elements
-            for element in soup(
-                ["script", "style", "nav", "footer", "header", "aside"]
-            ):
-                element.decompose()
+        main_content = soup.find("main") or soup.find("article") or soup.find("body")
 
-            title = soup.title.string.strip() if soup.title else "Website Content"
+        if main_content:
+            text = main_content.get_text(separator=" ", strip=True)
+        else:
+            text = soup.get_text(separator=" ", strip=True)
 
-            main_content = (
-                soup.find("main") or soup.find("article") or soup.find("body")
-            )
+        cleaned_text = _WHITESPACE_RE.sub(" ", text).strip()
+
+        return cleaned_text, title
+
+    @staticmethod
+    async def _fetch(
+        session: aiohttp.ClientSession, url: str, sem: asyncio.Semaphore
+    ) -> bytes:
+        async with sem, session.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    @staticmethod
+    async def extract_website_content(
+        url: str, session: aiohttp.ClientSession, sem: asyncio.Semaphore
+    ) -> Optional[Tuple[str, str]]:
+        try:
+            if not url.startswith(("http://", "https://")):
+                url = "https://" + url
 
-            if main_content:
-                text = main_content.get_text(separator=" ", strip=True)
-            else:
-                text = soup.get_text(separator=" ", strip=True)
+            content = await DocumentProcessor._fetch(session, url, sem)
 
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            cleaned_text = " ".join(chunk for chunk in chunks if chunk)
+            # Parsing is CPU-bound, so run it off the event loop to let
+            # several pages parse concurrently
+            cleaned_text, title = await asyncio.to_thread(
+                DocumentProcessor._parse_html, content
+            )
 
             if not cleaned_text.strip():
                 st.warning("No content could be extracted from website")
@@ -112,3 +217,61 @@ class DocumentProcessor:
         except Exception as e:
             st.error(f"Error extracting website content: {str(e)}")
             return None
+
+    @staticmethod
+    def extract_websites(urls: List[str]) -> List[Optional[Tuple[str, str]]]:
+        """Fetch and parse several websites concurrently, preserving input order
+
+        Successful extractions are reused per URL for WEBSITE_CACHE_TTL; failed
+        ones are not stored, so processing again retries them.
+        """
+        now = time.monotonic()
+        results: List[Optional[Tuple[str, str]]] = [None] * len(urls)
+        misses = []
+
+        with _website_cache_lock:
+            for i, url in enumerate(urls):
+                entry = _website_cache.get(url)
+                if entry is not None and now - entry[0] < WEBSITE_CACHE_TTL:
+                    _website_cache.move_to_end(url)
+                    results[i] = entry[1]
+                else:
+                    misses.append(i)
+
+        if not misses:
+            return results
+
+        async def _gather():
+            # One shared session, with a bound on how many fetches are in flight
+            sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+            # Keep-alive connections are pooled and reused across URLs on the
+            # same host, with headers and timeout set once for the session
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300)
+            async with aiohttp.ClientSession(
+                headers=WEB_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=15),
+                connector=connector,
+            ) as session:
+                return await asyncio.gather(
+                    *[
+                        DocumentProcessor.extract_website_content(
+                            urls[i], session, sem
+                        )
+                        for i in misses
+                    ]
+                )
+
+        fetched = asyncio.run(_gather())
+
+        with _website_cache_lock:
+            fetched_at = time.monotonic()
+            for i, result in zip(misses, fetched):
+                results[i] = result
+                if result is not None:
+                    _website_cache[urls[i]] = (fetched_at, result)
+                    _website_cache.move_to_end(urls[i])
+
+            while len(_website_cache) > EXTRACTION_CACHE_ENTRIES:
+                _website_cache.popitem(last=False)
+
+        return results
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+_MAX_PARAMS = 500
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store backed by SQLite
+
+    Embeddings are keyed by a BLAKE2b digest of model name + text, so chunks
+    that were embedded before (e.g. a PDF re-uploaded after a Streamlit
+    reload) are served from disk instead of calling the embedding API again.
+    """
+
+    def __init__(self, path: str, model: str):
+        self.model = model
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Streamlit reruns the script on different threads, so the
+            # connection is shared across threads and guarded by a lock
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                "hash BLOB PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Embedding cache disabled =======> {str(e)}")
+            self._conn = None
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.model}|{text}".encode("utf-8"), digest_size=16
+        ).digest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up several texts with a single query; misses come back as None"""
+        if self._conn is None or not texts:
+            return [None] * len(texts)
+
+        keys = [self.key(text) for text in texts]
+        unique_keys = list(set(keys))
+
+        # Stay under SQLite's limit on bound parameters per statement
+        rows = []
+        with self._lock:
+            for start in range(0, len(unique_keys), _MAX_PARAMS):
+                batch = unique_keys[start : start + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(
+                    self._conn.execute(
+                        f"SELECT hash, dim, vec FROM vectors WHERE hash IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                )
+
+        found = {key: self._decode(dim, vec) for key, dim, vec in rows}
+        return [found.get(key) for key in keys]
+
+    @staticmethod
+    def _decode(dim: int, vec: bytes) -> List[float]:
+        # Rows written before the switch to float16 are still float32
+        dtype = np.float16 if len(vec) == dim * 2 else np.float32
+        return np.frombuffer(vec, dtype=dtype).astype(np.float32).tolist()
+
+    def set(self, text: str, embedding: List[float]) -> None:
+        self.set_many([text], [embedding])
+
+    def set_many(self, texts: List[str], embeddings: List[List[float]]) -> None:
+        if self._conn is None or not texts:
+            return
+
+        # Vectors are stored as float16, a quarter of the footprint of
+        # float64 Python floats
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            vector = np.asarray(embedding, dtype=np.float16)
+            rows.append((self.key(text), vector.size, vector.tobytes()))
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (hash, dim, vec) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
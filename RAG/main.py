@@ -1,6 +1,6 @@
 import streamlit as st
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from config import validate_config, GEMINI_API_KEY, SERPER_API_KEY
 from rag_system import RAGSystem
@@ -25,6 +25,18 @@ if "system_initialized" not in st.session_state:
     st.session_state.system_initialized = False
 
 
+@st.cache_resource(show_spinner=False)
+def get_rag_system(gemini_key: str, serper_key: Optional[str]) -> RAGSystem:
+    """One RAG system per set of keys, shared across reruns and sessions"""
+    rag_system = RAGSystem()
+
+    # Raising keeps a failed initialization out of the cache
+    if not rag_system.initialize(gemini_key, serper_key):
+        raise RuntimeError("Failed to initialize RAG system")
+
+    return rag_system
+
+
 def initialize_system():
     """Initialize RAG system with environment variables"""
     try:
@@ -33,15 +45,9 @@ def initialize_system():
         if not is_valid:
             return False
 
-        if st.session_state.rag_system is None:
-            st.session_state.rag_system = RAGSystem()
-
-        if st.session_state.rag_system.initialize(gemini_key, serper_key):
-            st.session_state.system_initialized = True
-            return True
-        else:
-            st.error("Failed to initialize RAG system")
-            return False
+        st.session_state.rag_system = get_rag_system(gemini_key, serper_key)
+        st.session_state.system_initialized = True
+        return True
 
     except Exception as e:
         st.error(f"Error during system initialization: {str(e)}")
@@ -93,6 +99,8 @@ def chat_interface():
 
     chat_container = st.container(height=400)
 
+    # Render history before handling new input: the turn submitted in this run
+    # is drawn once below and only joins the history loop on the next rerun
     with chat_container:
         for message in st.session_state.chat_history:
             with st.chat_message(message["role"]):
@@ -107,12 +115,12 @@ def chat_interface():
         with chat_container.chat_message("user"):
             st.markdown(prompt)
 
-        # Generate response
+        # Generate response, rendering tokens as they arrive
         with chat_container.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                rag_result = st.session_state.rag_system.generate_response(prompt)
+                rag_result = st.session_state.rag_system.stream_response(prompt)
 
-                st.markdown(rag_result["response"])
+            rag_result["response"] = st.write_stream(rag_result["response_stream"])
 
         # Add assistant response
         st.session_state.chat_history.append(
@@ -123,8 +131,6 @@ def chat_interface():
             }
         )
 
-        st.rerun()
-
 
 def knowledge_base_interface():
     """Interface for managing knowledge base documents"""
@@ -156,7 +162,9 @@ def knowledge_base_interface():
         if pdf_files and st.button("Process PDFs"):
             for pdf_file in pdf_files:
                 with st.spinner(f"Processing {pdf_file.name}..."):
-                    text = DocumentProcessor.extract_pdf_text(pdf_file)
+                    text = DocumentProcessor.extract_pdf_text(
+                        pdf_file.getvalue(), pdf_file.name
+                    )
                     if text:
                         success = st.session_state.rag_system.add_document(
                             text, "PDF", pdf_file.name
@@ -181,12 +189,31 @@ def knowledge_base_interface():
         )
 
         if website_urls and st.button("Process Websites"):
-            urls = [url.strip() for url in website_urls.split("\n") if url.strip()]
+            # Drop duplicate URLs, keeping the order they were entered in
+            urls = list(
+                dict.fromkeys(
+                    url.strip() for url in website_urls.splitlines() if url.strip()
+                )
+            )
+
+            # Skip websites already added to the knowledge base this session
+            processed_urls = {
+                doc["url"] for doc in st.session_state.processed_documents if "url" in doc
+            }
+            skipped = [url for url in urls if url in processed_urls]
+            urls = [url for url in urls if url not in processed_urls]
+
+            if skipped:
+                st.info(f"Skipping {len(skipped)} already processed website(s)")
+
+            results = []
+            if urls:
+                with st.spinner(f"Fetching {len(urls)} website(s)..."):
+                    results = DocumentProcessor.extract_websites(urls)
 
-            for url in urls:
-                with st.spinner(f"Processing {url}..."):
-                    result = DocumentProcessor.extract_website_content(url)
-                    if result:
+            for url, result in zip(urls, results):
+                if result:
+                    with st.spinner(f"Processing {url}..."):
                         text, title = result
                         success = st.session_state.rag_system.add_document(
                             text, "Website", title
@@ -196,6 +223,7 @@ def knowledge_base_interface():
                                 {
                                     "name": title,
                                     "type": "Website",
+                                    "url": url,
                                     "timestamp": datetime.now().strftime(
                                         "%Y-%m-%d %H:%M"
                                     ),
@@ -11,12 +11,58 @@ This module provides evaluation capabilities for RAG system quality assessment.
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+from numba import njit, prange
+from sklearn.feature_extraction.text import HashingVectorizer
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
 
+# Common words ignored by the word-overlap metrics
+_STOP_WORDS_BASE = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "and",
+        "or",
+        "but",
+        "in",
+        "on",
+        "at",
+        "to",
+        "for",
+        "of",
+        "with",
+        "by",
+    }
+)
+_STOP_WORDS_QA = _STOP_WORDS_BASE | frozenset({"what", "how", "when", "where", "why"})
+
+
+@njit(parallel=True, cache=True)
+def _overlap_kernel(a_indptr, a_indices, b_indptr, b_indices, out):
+    """Merge-intersect the sorted token ids of each pair of rows"""
+    for row in prange(out.shape[0]):
+        i, i_end = a_indptr[row], a_indptr[row + 1]
+        j, j_end = b_indptr[row], b_indptr[row + 1]
+        count = 0
+
+        while i < i_end and j < j_end:
+            if a_indices[i] == b_indices[j]:
+                count += 1
+                i += 1
+                j += 1
+            elif a_indices[i] < b_indices[j]:
+                i += 1
+            else:
+                j += 1
+
+        out[row] = count
+
+
 class RAGEvaluator:
     """
     RAG Evaluation using RAGAS framework
@@ -32,6 +78,116 @@ class RAGEvaluator:
         self.rag_system = rag_system
         self.evaluation_history = []
 
+        # Binary bag-of-words vectorizers: word-set overlaps become sparse
+        # dot products, and tokenization happens in one regex pass per batch
+        self.vectorizer = self._build_vectorizer(_STOP_WORDS_BASE)
+
+        # Question/answer comparisons also ignore interrogative words
+        self.qa_vectorizer = self._build_vectorizer(_STOP_WORDS_QA)
+
+    @staticmethod
+    def _build_vectorizer(stop_words: frozenset) -> HashingVectorizer:
+        return HashingVectorizer(
+            n_features=2**18,
+            binary=True,
+            norm=None,
+            alternate_sign=False,
+            lowercase=True,
+            token_pattern=r"\S+",
+            stop_words=list(stop_words),
+        )
+
+    @staticmethod
+    def _row_overlap(a, b) -> np.ndarray:
+        """Number of shared words between matching rows of two binary matrices"""
+        a, b = a.tocsr(), b.tocsr()
+        a.sort_indices()
+        b.sort_indices()
+
+        out = np.zeros(a.shape[0], dtype=np.int64)
+        _overlap_kernel(a.indptr, a.indices, b.indptr, b.indices, out)
+        return out
+
+    @staticmethod
+    def _row_size(a) -> np.ndarray:
+        """Number of distinct words in each row of a binary matrix"""
+        return np.asarray(a.sum(axis=1)).ravel()
+
+    def _batch_faithfulness(
+        self, answers: List[str], contexts: List[str]
+    ) -> np.ndarray:
+        answer_vecs = self.vectorizer.transform(answers)
+        context_vecs = self.vectorizer.transform(contexts)
+
+        answer_sizes = self._row_size(answer_vecs)
+        overlap = self._row_overlap(answer_vecs, context_vecs)
+
+        # Empty answers (or answers made only of stop words) score 0
+        scores = np.divide(
+            overlap,
+            answer_sizes,
+            out=np.zeros(len(answers)),
+            where=answer_sizes > 0,
+        )
+        return np.minimum(scores, 1.0)
+
+    def _batch_relevancy(self, questions: List[str], answers: List[str]) -> np.ndarray:
+        question_vecs = self.qa_vectorizer.transform(questions)
+        answer_vecs = self.qa_vectorizer.transform(answers)
+
+        question_sizes = self._row_size(question_vecs)
+        overlap = self._row_overlap(question_vecs, answer_vecs)
+
+        # Neutral score if no meaningful question words
+        scores = np.divide(
+            overlap,
+            question_sizes,
+            out=np.full(len(questions), 0.5),
+            where=question_sizes > 0,
+        )
+        scores = np.minimum(scores, 1.0)
+
+        # Bonus for appropriate answer length
+        answer_lengths = np.array([len(answer) for answer in answers])
+        has_good_length = (answer_lengths >= 50) & (answer_lengths <= 500)
+        scores = np.where(
+            (question_sizes > 0) & has_good_length,
+            np.minimum(scores + 0.1, 1.0),
+            scores,
+        )
+
+        # Missing question or answer scores 0
+        missing = np.array([not q or not a for q, a in zip(questions, answers)])
+        return np.where(missing, 0.0, scores)
+
+    def _batch_context_precision(
+        self, questions: List[str], retrieved_chunks: List[List[str]]
+    ) -> np.ndarray:
+        counts = np.array([len(chunks) for chunks in retrieved_chunks])
+        scores = np.zeros(len(questions))
+
+        if not counts.sum():
+            return scores
+
+        # Pair every retrieved chunk with the row of the question it belongs to
+        owner = np.repeat(np.arange(len(questions)), counts)
+        question_vecs = self.vectorizer.transform(questions)[owner]
+        chunk_vecs = self.vectorizer.transform(
+            [chunk for chunks in retrieved_chunks for chunk in chunks]
+        )
+
+        # Consider chunk relevant if it has at least 2 meaningful word matches
+        relevant = self._row_overlap(question_vecs, chunk_vecs) >= 2
+        relevant_per_question = np.bincount(
+            owner, weights=relevant, minlength=len(questions)
+        )
+
+        has_chunks = counts > 0
+        scores[has_chunks] = relevant_per_question[has_chunks] / counts[has_chunks]
+
+        missing = np.array([not q for q in questions])
+        return np.where(missing, 0.0, scores)
+
     def evaluate_faithfulness(self, question: str, answer: str, context: str) -> float:
         """
         Evaluate faithfulness: How well is the answer grounded in context?
@@ -45,38 +201,8 @@ class RAGEvaluator:
         if not context or not answer:
             return 0.0
 
-        # Simple keyword overlap check (simplified version)
-        context_words = set(context.lower().split())
-        answer_words = set(answer.lower().split())
-
-        # Remove common stop words for better evaluation
-        stop_words = {
-            "the",
-            "a",
-            "an",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-        }
-        context_words = context_words - stop_words
-        answer_words = answer_words - stop_words
-
-        if not answer_words:
-            return 0.0
-
-        # Calculate overlap ratio
-        overlap = len(context_words.intersection(answer_words))
-        faithfulness_score = min(overlap / len(answer_words), 1.0)
-
-        return faithfulness_score
+        # Word overlap check (simplified version)
+        return float(self._batch_faithfulness([answer], [context])[0])
 
     def evaluate_relevancy(self, question: str, answer: str) -> float:
         """
@@ -89,46 +215,7 @@ class RAGEvaluator:
         if not question or not answer:
             return 0.0
 
-        question_words = set(question.lower().split())
-        answer_words = set(answer.lower().split())
-
-        # Remove stop words
-        stop_words = {
-            "the",
-            "a",
-            "an",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-            "what",
-            "how",
-            "when",
-            "where",
-            "why",
-        }
-        question_words = question_words - stop_words
-        answer_words = answer_words - stop_words
-
-        if not question_words:
-            return 0.5  # Neutral score if no meaningful question words
-
-        # Calculate relevancy based on word overlap
-        overlap = len(question_words.intersection(answer_words))
-        relevancy_score = min(overlap / len(question_words), 1.0)
-
-        # Bonus for appropriate answer length
-        if 50 <= len(answer) <= 500:  # Reasonable answer length
-            relevancy_score = min(relevancy_score + 0.1, 1.0)
-
-        return relevancy_score
+        return float(self._batch_relevancy([question], [answer])[0])
 
     def evaluate_context_precision(
         self, question: str, retrieved_chunks: List[str]
@@ -143,37 +230,7 @@ class RAGEvaluator:
         if not retrieved_chunks or not question:
             return 0.0
 
-        question_words = set(question.lower().split())
-        stop_words = {
-            "the",
-            "a",
-            "an",
-            "and",
-            "or",
-            "but",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "by",
-        }
-        question_words = question_words - stop_words
-
-        relevant_chunks = 0
-
-        for chunk in retrieved_chunks:
-            chunk_words = set(chunk.lower().split()) - stop_words
-            overlap = len(question_words.intersection(chunk_words))
-
-            # Consider chunk relevant if it has significant overlap with question
-            if overlap >= 2:  # At least 2 meaningful word matches
-                relevant_chunks += 1
-
-        precision = relevant_chunks / len(retrieved_chunks)
-        return precision
+        return float(self._batch_context_precision([question], [retrieved_chunks])[0])
 
     def run_evaluation(
         self, test_questions: List[str], include_web_search: bool = False
@@ -188,6 +245,9 @@ class RAGEvaluator:
         - Response times
         """
         evaluation_results = []
+        answers = []
+        contexts = []
+        chunks_per_question = []
 
         progress_bar = st.progress(0)
 
@@ -203,34 +263,16 @@ class RAGEvaluator:
                 end_time = datetime.now()
                 response_time = (end_time - start_time).total_seconds()
 
-                # Retrieve context for evaluation
-                retrieval_results = self.rag_system.retrieve_context(
-                    question, include_web_search
-                )
-                retrieved_chunks = [
-                    r["document"]
-                    for r in self.rag_system.vector_db.similarity_search(question)
-                ]
-
-                # Calculate evaluation metrics
-                faithfulness = self.evaluate_faithfulness(
-                    question, rag_result["response"], retrieval_results["context"]
-                )
-
-                relevancy = self.evaluate_relevancy(question, rag_result["response"])
+                # Evaluate against the context the response was generated from
+                answers.append(rag_result["response"])
+                contexts.append(rag_result["context_used"])
+                chunks_per_question.append(rag_result["retrieved_chunks"])
 
-                context_precision = self.evaluate_context_precision(
-                    question, retrieved_chunks
-                )
-
-                # Store evaluation result
+                # Store evaluation result (metrics are filled in below)
                 evaluation_results.append(
                     {
                         "question": question,
                         "answer": rag_result["response"],
-                        "faithfulness": round(faithfulness, 3),
-                        "relevancy": round(relevancy, 3),
-                        "context_precision": round(context_precision, 3),
                         "response_time_sec": round(response_time, 2),
                         "vector_results": rag_result["vector_results_count"],
                         "web_results": rag_result["web_results_count"],
@@ -242,6 +284,25 @@ class RAGEvaluator:
 
         progress_bar.empty()
 
+        # Calculate evaluation metrics for all questions at once
+        faithfulness = self._batch_faithfulness(answers, contexts)
+        relevancy = self._batch_relevancy(test_questions, answers)
+        context_precision = self._batch_context_precision(
+            test_questions, chunks_per_question
+        )
+
+        evaluation_results = [
+            {
+                "question": result["question"],
+                "answer": result["answer"],
+                "faithfulness": round(float(faithfulness[i]), 3),
+                "relevancy": round(float(relevancy[i]), 3),
+                "context_precision": round(float(context_precision[i]), 3),
+                **{k: v for k, v in result.items() if k not in ("question", "answer")},
+            }
+            for i, result in enumerate(evaluation_results)
+        ]
+
         # Convert to DataFrame for easy analysis
         df = pd.DataFrame(evaluation_results)
 
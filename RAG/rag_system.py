@@ -1,12 +1,44 @@
 import pandas as pd
-from google import genai
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from google.genai import types
 import streamlit as st
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from vector_database import ChromaVectorDB
 from web_search import WebSearcher
 from document_processor import DocumentProcessor
-from config import GEMINI_MODEL, MAX_TOKENS, TEMPERATURE, GEMINI_API_KEY, SERPER_API_KEY
+from reranker import Reranker
+from config import (
+    GEMINI_MODEL,
+    MAX_TOKENS,
+    TEMPERATURE,
+    GEMINI_API_KEY,
+    SERPER_API_KEY,
+    RESPONSE_CACHE_SIZE,
+    SIMILARITY_SEARCH_RESULTS,
+    RERANKER_ENABLED,
+    RERANKER_MODEL,
+    RERANKER_OVERSAMPLE,
+    MMR_ENABLED,
+    CONTEXT_BUDGET_TOKENS,
+    CHARS_PER_TOKEN,
+)
+
+
+# Identical on every request, so it goes first as the system instruction and
+# the provider can reuse its cached prefix; per-query content follows it
+SYSTEM_INSTRUCTION = """You are a helpful AI assistant with access to a knowledge base and web search.
+
+INSTRUCTIONS:
+1. Use the provided context to answer the user's question accurately
+2. If the context contains relevant information, prioritize it in your response
+3. If the context doesn't fully answer the question, provide general knowledge while noting limitations
+4. Be clear about what information comes from the knowledge base vs general knowledge
+5. Provide specific and helpful answers"""
 
 
 class RAGSystem:
@@ -16,6 +48,26 @@ class RAGSystem:
         self.doc_processor = DocumentProcessor()
         self.client = None
 
+        # Answers to repeated questions, cleared whenever the knowledge base
+        # changes. The system is shared across sessions (st.cache_resource),
+        # so script threads only touch the cache under the lock
+        self._response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+
+        # Define tool configuration if needed (currently none in standard response)
+        # You can pass tools=[] to generate_content if required.
+        self.generation_config = types.GenerateContentConfig(
+            system_instruction=SYSTEM_INSTRUCTION,
+            max_output_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+        )
+
+        self.reranker = Reranker(RERANKER_MODEL) if RERANKER_ENABLED else None
+        # With a reranker, fetch extra candidates for it to choose from
+        self.n_candidates = SIMILARITY_SEARCH_RESULTS * (
+            RERANKER_OVERSAMPLE if self.reranker else 1
+        )
+
     def initialize(
         self, gemini_api_key: str, serper_api_key: Optional[str] = None
     ) -> bool:
@@ -25,8 +77,9 @@ class RAGSystem:
                 print("=======> Failed to initialize ChromaDB vector database")
                 return False
 
-            self.client = genai.Client(api_key=gemini_api_key)
-            
+            # Share the vector database's Gemini client instead of opening another
+            self.client = self.vector_db.client
+
             print("Gemini connection successful =============>")
 
             if serper_api_key:
@@ -55,22 +108,130 @@ class RAGSystem:
             return False
 
         # Add chunks to vector database
-        return self.vector_db.add_documents(chunks, source_type, source_name)
+        added = self.vector_db.add_documents(chunks, source_type, source_name)
+        if added:
+            with self._response_cache_lock:
+                self._response_cache.clear()
+
+        return added
+
+    def _web_search_enabled(self, include_web_search: bool) -> bool:
+        return bool(
+            include_web_search and self.web_searcher and self.web_searcher.enabled
+        )
+
+    def _web_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        # Worker threads get the script's run context so st.* calls still render
+        return ThreadPoolExecutor(
+            max_workers=max_workers,
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx()),
+        )
+
+    def _vector_search(self, query: str) -> List[Dict[str, Any]]:
+        # Vector database retrieval using ChromaDB similarity search
+        if MMR_ENABLED:
+            vector_results = self.vector_db.mmr_search(query, self.n_candidates)
+        else:
+            vector_results = self.vector_db.similarity_search(query, self.n_candidates)
+        return self._rerank(query, vector_results)
+
+    def _rerank(
+        self, query: str, vector_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        if not self.reranker:
+            return vector_results
+
+        try:
+            return self.reranker.rerank(query, vector_results, SIMILARITY_SEARCH_RESULTS)
+        except Exception as e:
+            # Fall back to vector ordering if the reranker is unavailable
+            st.error(f"Error reranking results: {str(e)}")
+            return vector_results[:SIMILARITY_SEARCH_RESULTS]
 
     def retrieve_context(
         self, query: str, include_web_search: bool = False
     ) -> Dict[str, Any]:
-        context_parts = []
-        sources = []
+        if not self._web_search_enabled(include_web_search):
+            vector_results = self._vector_search(query)
+            return self._assemble_context(vector_results, [])
+
+        # Both lookups are network-bound, so run the web search alongside the
+        # vector search instead of after it
+        with self._web_executor(max_workers=1) as executor:
+            web_future = executor.submit(self.web_searcher.search, query)
+            vector_results = self._vector_search(query)
+            web_results = web_future.result()
+
+        return self._assemble_context(vector_results, web_results)
+
+    def batch_retrieve_context(
+        self, queries: List[str], include_web_search: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Retrieve context for several queries with one vector database call"""
+        if not self._web_search_enabled(include_web_search):
+            batch_results = self._batch_vector_search(queries)
+            return [self._assemble_context(results, []) for results in batch_results]
+
+        with self._web_executor(max_workers=min(4, len(queries) or 1)) as executor:
+            web_futures = [
+                executor.submit(self.web_searcher.search, query) for query in queries
+            ]
+            batch_results = self._batch_vector_search(queries)
+            web_batch = [future.result() for future in web_futures]
+
+        return [
+            self._assemble_context(vector_results, web_results)
+            for vector_results, web_results in zip(batch_results, web_batch)
+        ]
+
+    def _batch_vector_search(self, queries: List[str]) -> List[List[Dict[str, Any]]]:
+        if MMR_ENABLED:
+            # MMR needs each query's candidate embeddings, so search one by one
+            return [self._vector_search(query) for query in queries]
+
+        batch_results = self.vector_db.batch_similarity_search(
+            queries, self.n_candidates
+        )
+        return [
+            self._rerank(query, vector_results)
+            for query, vector_results in zip(queries, batch_results)
+        ]
+
+    @staticmethod
+    def _parts_within_budget(parts: List[str], budget: int) -> int:
+        """How many leading parts fit in `budget` characters, separators included"""
+        return bisect_right(list(accumulate(len(part) + 2 for part in parts)), budget)
+
+    def _assemble_context(
+        self,
+        vector_results: List[Dict[str, Any]],
+        web_results: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        # Chunk texts are collected once and shared by the context and the
+        # returned retrieved_chunks
+        retrieved_chunks = [result["document"] for result in vector_results]
+        web_parts = [
+            f"Web Result: {result['title']} - {result['snippet']}"
+            for result in web_results
+        ]
+
+        # Results arrive best first, so keep the prompt within the context
+        # budget by dropping the lowest ranked chunks, then web results
+        budget = CONTEXT_BUDGET_TOKENS * CHARS_PER_TOKEN
+        kept = self._parts_within_budget(retrieved_chunks, budget)
+        vector_results, retrieved_chunks = vector_results[:kept], retrieved_chunks[:kept]
+
+        budget -= sum(len(chunk) + 2 for chunk in retrieved_chunks)
+        kept = self._parts_within_budget(web_parts, budget)
+        web_results, web_parts = web_results[:kept], web_parts[:kept]
 
-        # Vector database retrieval using ChromaDB similarity search
-        vector_results = self.vector_db.similarity_search(query)
+        sources = []
 
         if vector_results:
             print("Found relevant chunks in vector database")
 
             for result in vector_results:
-                context_parts.append(result["document"])
                 sources.append(
                     {
                         "type": "vector_db",
@@ -80,93 +241,178 @@ class RAGSystem:
                 )
 
         # Web search retrieval (if enabled and requested)
-        web_results = []
-        if include_web_search and self.web_searcher and self.web_searcher.enabled:
-            web_results = self.web_searcher.search(query)
-
-            if web_results:
-                st.info(f"Found {len(web_results)} web search results")
-
-                # Add web results to context
-                for result in web_results:
-                    context_parts.append(
-                        f"Web Result: {result['title']} - {result['snippet']}"
-                    )
-                    sources.append(
-                        {
-                            "type": "web_search",
-                            "source": result["title"],
-                            "link": result["link"],
-                        }
-                    )
+        if web_results:
+            st.info(f"Found {len(web_results)} web search results")
+
+            # Add web results to context
+            for result in web_results:
+                sources.append(
+                    {
+                        "type": "web_search",
+                        "source": result["title"],
+                        "link": result["link"],
+                    }
+                )
 
         return {
-            "context": "\n\n".join(context_parts),
+            # A single join sizes the result once and copies each part once
+            "context": "\n\n".join(retrieved_chunks + web_parts),
             "sources": sources,
+            "retrieved_chunks": retrieved_chunks,
             "vector_results": len(vector_results),
             "web_results": len(web_results),
         }
 
+    def _get_cached_response(self, key: Tuple[str, bool]) -> Optional[Dict[str, Any]]:
+        with self._response_cache_lock:
+            result = self._response_cache.get(key)
+            if result is None:
+                return None
+
+            self._response_cache.move_to_end(key)
+            return dict(result)
+
+    def _cache_response(self, key: Tuple[str, bool], result: Dict[str, Any]) -> None:
+        with self._response_cache_lock:
+            self._response_cache[key] = dict(result)
+            self._response_cache.move_to_end(key)
+
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+    def _prepare_generation(
+        self, query: str, include_web_search: bool
+    ) -> Tuple[Dict[str, Any], str, types.GenerateContentConfig]:
+        retrieval_results = self.retrieve_context(query, include_web_search)
+
+        system_prompt = self._build_system_prompt(retrieval_results["context"], query)
+
+        return retrieval_results, system_prompt, self.generation_config
+
+    @staticmethod
+    def _build_result(
+        generated_text: str, retrieval_results: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            "response": generated_text,
+            "context_used": retrieval_results["context"],
+            "sources": retrieval_results["sources"],
+            "retrieved_chunks": retrieval_results["retrieved_chunks"],
+            "vector_results_count": retrieval_results["vector_results"],
+            "web_results_count": retrieval_results["web_results"],
+        }
+
+    @staticmethod
+    def _error_result() -> Dict[str, Any]:
+        return {
+            "response": "I apologize, but I encountered an error generating a response. Please try again.",
+            "context_used": "",
+            "sources": [],
+            "retrieved_chunks": [],
+            "vector_results_count": 0,
+            "web_results_count": 0,
+        }
+
     def generate_response(
         self, query: str, include_web_search: bool = False
     ) -> Dict[str, Any]:
+        key = (query, include_web_search)
+
         try:
-            retrieval_results = self.retrieve_context(query, include_web_search)
+            cached = self._get_cached_response(key)
+            if cached is not None:
+                return cached
 
-            system_prompt = self._build_system_prompt(
-                retrieval_results["context"], query
+            retrieval_results, system_prompt, config = self._prepare_generation(
+                query, include_web_search
             )
 
-            # Define tool configuration if needed (currently none in standard response)
-            # You can pass tools=[] to generate_content if required.
-            
             response = self.client.models.generate_content(
                 model=GEMINI_MODEL,
-                contents=system_prompt, # Using system prompt as content for now or pass as system_instruction
-                config=types.GenerateContentConfig(
-                    max_output_tokens=MAX_TOKENS,
-                    temperature=TEMPERATURE,
-                ),
+                contents=system_prompt,
+                config=config,
             )
 
-            generated_text = response.text
+            result = self._build_result(response.text, retrieval_results)
 
-            return {
-                "response": generated_text,
-                "context_used": retrieval_results["context"],
-                "sources": retrieval_results["sources"],
-                "vector_results_count": retrieval_results["vector_results"],
-                "web_results_count": retrieval_results["web_results"],
-            }
+            # Only successful responses are cached
+            self._cache_response(key, result)
+            return result
 
         except Exception as e:
             st.error(f"Error in RAG pipeline: {str(e)}")
-            return {
-                "response": "I apologize, but I encountered an error generating a response. Please try again.",
-                "context_used": "",
-                "sources": [],
-                "vector_results_count": 0,
-                "web_results_count": 0,
-            }
+            return self._error_result()
 
-    def _build_system_prompt(self, context: str, query: str) -> str:
-        base_prompt = f"""You are a helpful AI assistant with access to a knowledge base and web search.
+    def stream_response(
+        self, query: str, include_web_search: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Like generate_response, but the answer is streamed
 
-CONTEXT FROM KNOWLEDGE BASE:
-{context}
+        result["response_stream"] yields text as the model produces it; once
+        it is exhausted, result["response"] holds the full answer.
+        """
+        key = (query, include_web_search)
 
-INSTRUCTIONS:
-1. Use the provided context to answer the user's question accurately
-2. If the context contains relevant information, prioritize it in your response
-3. If the context doesn't fully answer the question, provide general knowledge while noting limitations
-4. Be clear about what information comes from the knowledge base vs general knowledge
-5. Provide specific and helpful answers
+        cached = self._get_cached_response(key)
+        if cached is not None:
+            cached["response_stream"] = iter([cached["response"]])
+            return cached
 
-USER QUESTION: {query}
+        try:
+            retrieval_results, system_prompt, config = self._prepare_generation(
+                query, include_web_search
+            )
 
-Please provide a comprehensive response based on the available context."""
+            stream = self.client.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=system_prompt,
+                config=config,
+            )
 
-        return base_prompt
+        except Exception as e:
+            st.error(f"Error in RAG pipeline: {str(e)}")
+            result = self._error_result()
+            result["response_stream"] = iter([result["response"]])
+            return result
+
+        result = self._build_result("", retrieval_results)
+
+        def _stream() -> Iterator[str]:
+            parts = []
+            try:
+                for chunk in stream:
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+
+            except Exception as e:
+                st.error(f"Error in RAG pipeline: {str(e)}")
+                # Yield the failure notice too, so write_stream (and the chat
+                # history built from it) keeps it after the partial answer.
+                # Truncated answers are never cached.
+                error_text = self._error_result()["response"]
+                marker = f"\n\n{error_text}" if parts else error_text
+                parts.append(marker)
+                yield marker
+                result["response"] = "".join(parts)
+                return
+
+            result["response"] = "".join(parts)
+            self._cache_response(
+                key, {k: v for k, v in result.items() if k != "response_stream"}
+            )
+
+        result["response_stream"] = _stream()
+        return result
+
+    def _build_system_prompt(self, context: str, query: str) -> str:
+        # Only the per-query part; the fixed instructions are SYSTEM_INSTRUCTION
+        return (
+            f"CONTEXT FROM KNOWLEDGE BASE:\n{context}\n\n"
+            f"USER QUESTION: {query}\n\n"
+            "Please provide a comprehensive response based on the available context."
+        )
 
     def get_system_stats(self) -> Dict[str, Any]:
         """Get overall RAG system statistics"""
@@ -184,4 +430,6 @@ Please provide a comprehensive response based on the available context."""
 
     def clear_knowledge_base(self) -> bool:
         """Clear all documents from the vector database"""
+        with self._response_cache_lock:
+            self._response_cache.clear()
         return self.vector_db.delete_all_documents()
@@ -0,0 +1,40 @@
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+class Reranker:
+    """
+    Cross-encoder reranking of vector search results
+
+    A cross-encoder reads the query and each candidate chunk together, which
+    scores relevance more accurately than embedding distance alone. It runs
+    over an oversampled candidate set and keeps the best `top_k`.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+
+    def _load_model(self):
+        # sentence-transformers is only needed when reranking is enabled
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(self.model_name)
+        return self._model
+
+    def rerank(
+        self, query: str, results: List[Dict[str, Any]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        if len(results) <= 1:
+            return results[:top_k]
+
+        scores = self._load_model().predict(
+            [(query, result["document"]) for result in results],
+            batch_size=self.batch_size,
+        )
+
+        best = np.argsort(scores)[::-1][:top_k]
+        return [dict(results[i], rerank_score=float(scores[i])) for i in best]
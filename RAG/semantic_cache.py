@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """
+    In-process cache of similarity search results keyed by query embedding
+
+    A lookup hits when a cached query's embedding has cosine similarity of at
+    least `threshold` with the new one, so repeated or near-duplicate
+    questions skip the vector database query.
+    """
+
+    def __init__(self, threshold: float, ttl: float, max_size: int):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+
+        # key -> (unit embedding, n_results, results, insertion time)
+        self._entries = OrderedDict()
+        # Stacked unit embeddings and their keys, rebuilt after changes
+        self._keys = []
+        self._matrix = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [
+            key
+            for key, (_, _, _, created) in self._entries.items()
+            if now - created >= self.ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(
+        self, embedding: List[float], n_results: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            if not self._entries:
+                return None
+
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([entry[0] for entry in self._entries.values()])
+
+            # Cosine similarity against every cached query in one product
+            scores = self._matrix @ query
+
+            for idx in np.argsort(scores)[::-1]:
+                if scores[idx] < self.threshold:
+                    break
+
+                key = self._keys[idx]
+                _, cached_n_results, results, _ = self._entries[key]
+                if cached_n_results == n_results:
+                    self._entries.move_to_end(key)
+                    return list(results)
+
+            return None
+
+    def put(
+        self, embedding: List[float], n_results: int, results: List[Dict[str, Any]]
+    ) -> None:
+        query = self._normalize(embedding)
+        key = (query.tobytes(), n_results)
+
+        with self._lock:
+            self._entries[key] = (query, n_results, list(results), time.monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+            self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
@@ -1,35 +1,134 @@
 import chromadb
+import numpy as np
+from numba import njit
 from google import genai
+from google.genai import errors, types
+import httpx
 import streamlit as st
-import uuid
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import hashlib
+import importlib.util
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional
+from embedding_cache import EmbeddingCache
+from semantic_cache import SemanticQueryCache
 from config import (
     COLLECTION_NAME,
     SIMILARITY_SEARCH_RESULTS,
     GEMINI_EMBEDDING_MODEL,
     DISTANCE_FUNCTION,
+    HNSW_M,
+    HNSW_CONSTRUCTION_EF,
+    HNSW_SEARCH_EF,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_BATCH_SIZE,
+    CHROMA_ADD_BATCH_SIZE,
+    EMBEDDING_MAX_WORKERS,
+    EMBEDDING_MAX_RETRIES,
+    GEMINI_MAX_CONNECTIONS,
+    PROGRESS_UPDATE_INTERVAL,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_SIZE,
+    MMR_LAMBDA,
+    MMR_FETCH_K,
 )
 
+# httpx only speaks HTTP/2 with the optional h2 package (httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Host the embedding requests go to, warmed up once at startup
+_GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/"
+
+
+@njit(cache=True)
+def _mmr_select(relevance, similarity, k, lambda_):
+    """Carbonell-Goldstein MMR over precomputed query and pairwise similarities"""
+    n = relevance.shape[0]
+    selected = np.empty(k, dtype=np.int64)
+    chosen = np.zeros(n, dtype=np.bool_)
+    # Highest similarity of each candidate to anything already selected
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+
+    for step in range(k):
+        best = -1
+        best_score = -np.inf
+        for i in range(n):
+            if chosen[i]:
+                continue
+            score = lambda_ * relevance[i]
+            if step > 0:
+                score -= (1.0 - lambda_) * redundancy[i]
+            if score > best_score:
+                best_score = score
+                best = i
+
+        selected[step] = best
+        chosen[best] = True
+        for i in range(n):
+            if similarity[i, best] > redundancy[i]:
+                redundancy[i] = similarity[i, best]
+
+    return selected
+
+
+@st.cache_resource(show_spinner=False)
+def _get_chroma_client(path: str):
+    """One persistent client per path, so the store and its HNSW indexes are
+    loaded once per process rather than by every vector database instance"""
+    return chromadb.PersistentClient(path=path)
+
 
 class ChromaVectorDB:
     def __init__(self):
         self.chroma_client = None
         self.collection = None
         self.client = None
+        self._http_client = None
+
+        # Repeated texts (e.g. the same question asked twice) skip the API call
+        self._embed_cached = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._embed)
+        self.embedding_cache = EmbeddingCache(
+            EMBEDDING_CACHE_PATH, GEMINI_EMBEDDING_MODEL
+        )
+        self.query_cache = SemanticQueryCache(
+            SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL, SEMANTIC_CACHE_SIZE
+        )
 
     def initialize(self, gemini_api_key: str) -> bool:
         try:
-            self.client = genai.Client(api_key=gemini_api_key)
+            # A larger keep-alive pool lets the concurrent embedding requests
+            # reuse warm connections instead of queueing on the default pool,
+            # and HTTP/2 multiplexes them over a few connections when h2 is
+            # installed. The httpx client is built here so the warm-up below
+            # can use the same pool
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=GEMINI_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+                    keepalive_expiry=60.0,
+                ),
+                http2=_HTTP2,
+            )
+            self.client = genai.Client(
+                api_key=gemini_api_key,
+                http_options=types.HttpOptions(httpx_client=self._http_client),
+            )
+
+            # Open the first connection in the background while the app is
+            # idle, so the first upload or question skips the TCP + TLS setup
+            threading.Thread(target=self._warm_connection, daemon=True).start()
             
             # Initialize ChromaDB client with persistent storage
-            self.chroma_client = chromadb.PersistentClient(path="chromadb_collections")
+            self.chroma_client = _get_chroma_client("chromadb_collections")
 
             try:
-                self.collection = self.chroma_client.create_collection(
-                    name=COLLECTION_NAME,
-                    metadata={"hnsw:space": DISTANCE_FUNCTION},
-                )
+                self.collection = self._create_collection()
                 print("ChromaDB collection created successfully =============>")
             except Exception:
                 self.collection = self.chroma_client.get_collection(
@@ -43,22 +142,147 @@ class ChromaVectorDB:
             print(f"Error initializing vector database =======> {str(e)}")
             return False
 
+    def _warm_connection(self) -> None:
+        # A bare HEAD carries no API key, so it costs no quota; whatever the
+        # status, the connection it opened stays in the keep-alive pool
+        try:
+            self._http_client.head(_GEMINI_BASE_URL, timeout=10.0)
+        except httpx.HTTPError as e:
+            print(f"Gemini connection warm-up failed =======> {str(e)}")
+
+    def _create_collection(self):
+        return self.chroma_client.create_collection(
+            name=COLLECTION_NAME,
+            metadata={
+                "hnsw:space": DISTANCE_FUNCTION,
+                "hnsw:M": HNSW_M,
+                "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+                "hnsw:search_ef": HNSW_SEARCH_EF,
+            },
+        )
+
+    @staticmethod
+    def _quantize(values: List[float]) -> List[float]:
+        """
+        L2-normalize and round to float16 precision
+
+        Stored vectors then round-trip through the float16 embedding cache
+        unchanged, and cosine rankings are unaffected by the normalization.
+        """
+        vector = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        return vector.astype(np.float16).astype(np.float32).tolist()
+
+    def _embed(self, text: str) -> List[float]:
+        # Chunks embedded in earlier sessions are read back from disk
+        embedding = self.embedding_cache.get(text)
+        if embedding is not None:
+            return embedding
+
+        result = self.client.models.embed_content(
+            model=GEMINI_EMBEDDING_MODEL,
+            contents=text,
+            config={"task_type": "RETRIEVAL_DOCUMENT"},
+        )
+        embedding = self._quantize(result.embeddings[0].values)
+
+        self.embedding_cache.set(text, embedding)
+        return embedding
+
     def generate_embedding(self, text: str) -> Optional[List[float]]:
         try:
-            if not text.strip():
+            # Queries differing only in whitespace share one cache entry
+            text = " ".join(text.split())
+            if not text:
                 return None
 
-            result = self.client.models.embed_content(
-                model=GEMINI_EMBEDDING_MODEL,
-                contents=text,
-                config={"task_type": "RETRIEVAL_DOCUMENT"},
-            )
-            return result.embeddings[0].values
+            return self._embed_cached(text)
 
         except Exception as e:
             st.error(f"Error generating embedding: {str(e)}")
             return None
 
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """One embed_content request, retried with exponential backoff on rate limits"""
+        for attempt in range(EMBEDDING_MAX_RETRIES):
+            try:
+                result = self.client.models.embed_content(
+                    model=GEMINI_EMBEDDING_MODEL,
+                    contents=texts,
+                    config={"task_type": "RETRIEVAL_DOCUMENT"},
+                )
+                return [
+                    self._quantize(embedding.values) for embedding in result.embeddings
+                ]
+
+            except errors.APIError as e:
+                if e.code != 429 or attempt == EMBEDDING_MAX_RETRIES - 1:
+                    raise
+                time.sleep(2**attempt + random.random())
+
+    def _embed_window(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed one window of texts, reusing cached vectors
+
+        Safe to run in a worker thread: failures are raised, not reported
+        through Streamlit.
+        """
+        # Small jitter so concurrently submitted windows don't hit the API at once
+        time.sleep(random.random() * 0.05)
+
+        embeddings = self.embedding_cache.get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            vectors = self._embed_batch(missing_texts)
+            for i, embedding in zip(missing, vectors):
+                embeddings[i] = embedding
+            self.embedding_cache.set_many(missing_texts, vectors)
+
+        return embeddings
+
+    def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed many texts, reusing cached vectors and batching the API calls"""
+        embeddings = []
+        windows = [
+            texts[start : start + EMBEDDING_BATCH_SIZE]
+            for start in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ]
+
+        # Windows are embedded concurrently, as in add_documents
+        with ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS) as executor:
+            futures = [executor.submit(self._embed_window, batch) for batch in windows]
+
+            for batch, future in zip(windows, futures):
+                try:
+                    embeddings.extend(future.result())
+                except Exception as e:
+                    # Leave this batch as None so its texts are skipped
+                    st.error(f"Error generating embeddings: {str(e)}")
+                    embeddings.extend([None] * len(batch))
+
+        return embeddings
+
+    @staticmethod
+    def _chunk_id(source_type: str, source_name: str, chunk: str) -> str:
+        # The source name is part of the hash, so the same text uploaded under
+        # another name is stored (and attributed) separately
+        digest = hashlib.blake2b(
+            f"{source_name}\0{chunk}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return f"{source_type}:{digest}"
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Which of `ids` are already in the collection"""
+        existing = set()
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            existing.update(self.collection.get(ids=batch, include=[])["ids"])
+        return existing
+
     def add_documents(
         self, text_chunks: List[str], source_type: str, source_name: str
     ) -> bool:
@@ -66,46 +290,120 @@ class ChromaVectorDB:
             if not text_chunks or not self.collection:
                 return False
 
-            processed_chunks = 0
             progress_bar = st.progress(0)
-            status_text = st.empty()
 
+            # Keep each chunk's position in the document for its metadata.
+            # Ids are derived from the source name and chunk text, so repeated
+            # chunks collapse to one entry and chunks of a source that is
+            # already stored are not embedded again.
+            chunk_ids = {}
             for i, chunk in enumerate(text_chunks):
-                if not chunk.strip():
-                    continue
+                if chunk.strip():
+                    chunk_ids.setdefault(
+                        self._chunk_id(source_type, source_name, chunk), (i, chunk)
+                    )
 
-                # Chunking progress Bar
-                progress = (i + 1) / len(text_chunks)
-                progress_bar.progress(progress)
-                status_text.text(
-                    f"Embedding chunk {i + 1} of {len(text_chunks)} ========>"
-                )
+            existing = self._existing_ids(list(chunk_ids))
+            indexed_chunks = [
+                (chunk_id, i, chunk)
+                for chunk_id, (i, chunk) in chunk_ids.items()
+                if chunk_id not in existing
+            ]
 
-                embedding = self.generate_embedding(chunk)
-                if embedding is None:
-                    continue
+            if chunk_ids and not indexed_chunks:
+                progress_bar.empty()
+                st.info(f"{source_name} is already stored in ChromaDB")
+                return True
+            # One timestamp for the whole document instead of one per chunk
+            timestamp = datetime.now(timezone.utc).isoformat()
 
-                doc_id = f"{source_type}_{source_name}_{i}_{uuid.uuid4().hex[:8]}"
-
-                self.collection.add(
-                    documents=[chunk],  # Original text
-                    embeddings=[embedding],  # Vector representation
-                    metadatas=[
-                        {  # Metadata for filtering and tracking
-                            "source_type": source_type,
-                            "source_name": source_name,
-                            "chunk_index": i,
-                            "timestamp": datetime.now().isoformat(),
-                        }
-                    ],
-                    ids=[doc_id],  # Unique identifier
-                )
-                processed_chunks += 1
+            processed_chunks = 0
+
+            # Each window of chunks is embedded in one request; embedded chunks
+            # are stored CHROMA_ADD_BATCH_SIZE at a time
+            windows = [
+                indexed_chunks[start : start + EMBEDDING_BATCH_SIZE]
+                for start in range(0, len(indexed_chunks), EMBEDDING_BATCH_SIZE)
+            ]
+
+            # Embedding requests are network-bound, so several windows are in
+            # flight at once and each is written to Chroma as soon as it
+            # finishes, so one slow request doesn't hold back the rest.
+            # A single writer thread does the inserts, so assembling the next
+            # window never waits on the previous window's HNSW/disk write.
+            with ThreadPoolExecutor(
+                max_workers=EMBEDDING_MAX_WORKERS
+            ) as executor, ThreadPoolExecutor(max_workers=1) as writer:
+                writes = []
+                # Embedded chunks accumulate here until a full insert batch
+                pending = {"documents": [], "embeddings": [], "metadatas": [], "ids": []}
+                futures = {
+                    executor.submit(
+                        self._embed_window, [chunk for _, _, chunk in batch]
+                    ): batch
+                    for batch in windows
+                }
+
+                # At most ~100 progress updates, and none closer together than
+                # PROGRESS_UPDATE_INTERVAL; each is a single message to the
+                # frontend carrying both the bar and its label
+                progress_step = max(1, len(windows) // 100)
+                last_update = 0.0
+
+                done = 0
+                for window, future in enumerate(as_completed(futures), start=1):
+                    batch = futures[future]
+                    done += len(batch)
+
+                    now = time.monotonic()
+                    if window == len(windows) or (
+                        window % progress_step == 0
+                        and now - last_update >= PROGRESS_UPDATE_INTERVAL
+                    ):
+                        progress_bar.progress(
+                            done / len(indexed_chunks),
+                            text=f"Embedded {done} of {len(indexed_chunks)} chunks ========>",
+                        )
+                        last_update = now
+
+                    try:
+                        batch_embeddings = future.result()
+                    except Exception as e:
+                        # Skip this window's chunks, as a failed embedding did before
+                        st.error(f"Error generating embeddings: {str(e)}")
+                        continue
+
+                    for (chunk_id, i, chunk), embedding in zip(batch, batch_embeddings):
+                        pending["documents"].append(chunk)  # Original text
+                        pending["embeddings"].append(embedding)  # Vector representation
+                        pending["metadatas"].append(
+                            {  # Metadata for filtering and tracking
+                                "source_type": source_type,
+                                "source_name": source_name,
+                                "chunk_index": i,
+                                "timestamp": timestamp,
+                            }
+                        )
+                        pending["ids"].append(chunk_id)  # Content-derived identifier
+                    processed_chunks += len(batch)
+
+                    if len(pending["ids"]) >= CHROMA_ADD_BATCH_SIZE:
+                        writes.append(writer.submit(self.collection.add, **pending))
+                        pending = {key: [] for key in pending}
+
+                if pending["ids"]:
+                    writes.append(writer.submit(self.collection.add, **pending))
+
+                # Surface any failed insert once all writes have finished
+                for write in writes:
+                    write.result()
 
             progress_bar.empty()
-            status_text.empty()
 
             if processed_chunks > 0:
+                # Cached search results no longer reflect the collection
+                self.query_cache.clear()
+
                 st.success(
                     f"==========> Successfully stored {processed_chunks} chunks in ChromaDB"
                 )
@@ -119,6 +417,39 @@ class ChromaVectorDB:
             st.error(f"Error adding documents to vector database: {str(e)}")
             return False
 
+    @staticmethod
+    def _format_query_results(
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]],
+        distances: Optional[List[float]],
+    ) -> List[Dict[str, Any]]:
+        """Turn one query's Chroma results into search result dicts"""
+        if not documents:
+            return []
+
+        if metadatas is None:
+            metadatas = [{}] * len(documents)
+
+        # Convert all distances to similarities in one array operation
+        if distances is not None:
+            distance_array = np.asarray(distances, dtype=np.float64)
+            similarities = (1.0 - distance_array).tolist()
+            distances = distance_array.tolist()
+        else:
+            similarities = distances = [None] * len(documents)
+
+        return [
+            {
+                "document": doc,
+                "metadata": metadata,
+                "similarity_score": similarity,
+                "distance": distance,
+            }
+            for doc, metadata, similarity, distance in zip(
+                documents, metadatas, similarities, distances
+            )
+        ]
+
     def similarity_search(
         self, query: str, n_results: int = SIMILARITY_SEARCH_RESULTS
     ) -> List[Dict[str, Any]]:
@@ -132,6 +463,11 @@ class ChromaVectorDB:
             if query_embedding is None:
                 return []
 
+            # Near-duplicate questions reuse earlier results
+            cached_results = self.query_cache.get(query_embedding, n_results)
+            if cached_results is not None:
+                return cached_results
+
             results = self.collection.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results,
@@ -142,32 +478,140 @@ class ChromaVectorDB:
                 ],
             )
 
-            search_results = []
-            if results["documents"] and results["documents"][0]:
-                for i, doc in enumerate(results["documents"][0]):
-                    similarity_score = (
-                        1 - results["distances"][0][i] if results["distances"] else None
-                    )
-
-                    search_results.append(
-                        {
-                            "document": doc,
-                            "metadata": results["metadatas"][0][i]
-                            if results["metadatas"]
-                            else {},
-                            "similarity_score": similarity_score,
-                            "distance": results["distances"][0][i]
-                            if results["distances"]
-                            else None,
-                        }
-                    )
+            search_results = self._format_query_results(
+                results["documents"][0] if results["documents"] else [],
+                results["metadatas"][0] if results["metadatas"] else None,
+                results["distances"][0] if results["distances"] else None,
+            )
 
+            self.query_cache.put(query_embedding, n_results, search_results)
             return search_results
 
         except Exception as e:
             st.error(f"Error performing similarity search: {str(e)}")
             return []
 
+    def mmr_search(
+        self,
+        query: str,
+        n_results: int = SIMILARITY_SEARCH_RESULTS,
+        fetch_k: int = MMR_FETCH_K,
+        lambda_: float = MMR_LAMBDA,
+    ) -> List[Dict[str, Any]]:
+        """Similarity search diversified with maximal marginal relevance"""
+        try:
+            if not self.collection:
+                st.warning("Vector database not initialized")
+                return []
+
+            query_embedding = self.generate_embedding(query)
+            if query_embedding is None:
+                return []
+
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=max(fetch_k, n_results),
+                include=[
+                    "documents",
+                    "metadatas",
+                    "distances",
+                    "embeddings",
+                ],
+            )
+
+            search_results = self._format_query_results(
+                results["documents"][0] if results["documents"] else [],
+                results["metadatas"][0] if results["metadatas"] else None,
+                results["distances"][0] if results["distances"] else None,
+            )
+            if len(search_results) <= n_results:
+                return search_results
+
+            # Unit-length candidates as one contiguous array, so relevance and
+            # pairwise similarity are each a single BLAS call
+            candidates = np.asarray(results["embeddings"][0], dtype=np.float32)
+            candidates /= np.maximum(
+                np.linalg.norm(candidates, axis=1, keepdims=True), 1e-12
+            )
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_vector /= max(np.linalg.norm(query_vector), 1e-12)
+
+            selected = _mmr_select(
+                candidates @ query_vector,
+                candidates @ candidates.T,
+                n_results,
+                np.float32(lambda_),
+            )
+            return [search_results[i] for i in selected]
+
+        except Exception as e:
+            st.error(f"Error performing similarity search: {str(e)}")
+            return []
+
+    def batch_similarity_search(
+        self, queries: List[str], n_results: int = SIMILARITY_SEARCH_RESULTS
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries at once; results are indexed like `queries`"""
+        search_results = [[] for _ in queries]
+
+        try:
+            if not self.collection:
+                st.warning("Vector database not initialized")
+                return search_results
+
+            # Repeated queries in the batch are embedded and searched once
+            positions = {}
+            for i, query in enumerate(queries):
+                text = " ".join(query.split())
+                if text:
+                    positions.setdefault(text, []).append(i)
+
+            unique_queries = list(positions)
+            embeddings = self.generate_embeddings(unique_queries)
+
+            # Near-duplicate questions reuse earlier results, the rest are
+            # searched together in a single query call
+            pending = []
+            for text, embedding in zip(unique_queries, embeddings):
+                if embedding is None:
+                    continue
+
+                cached_results = self.query_cache.get(embedding, n_results)
+                if cached_results is not None:
+                    for i in positions[text]:
+                        search_results[i] = list(cached_results)
+                else:
+                    pending.append((text, embedding))
+
+            if not pending:
+                return search_results
+
+            results = self.collection.query(
+                query_embeddings=[embedding for _, embedding in pending],
+                n_results=n_results,
+                include=[
+                    "documents",
+                    "metadatas",
+                    "distances",
+                ],
+            )
+
+            for row, (text, embedding) in enumerate(pending):
+                query_results = self._format_query_results(
+                    results["documents"][row] if results["documents"] else [],
+                    results["metadatas"][row] if results["metadatas"] else None,
+                    results["distances"][row] if results["distances"] else None,
+                )
+                self.query_cache.put(embedding, n_results, query_results)
+                for i in positions[text]:
+                    search_results[i] = list(query_results)
+
+            return search_results
+
+        except Exception as e:
+            st.error(f"Error performing similarity search: {str(e)}")
+            return search_results
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the ChromaDB collection"""
         try:
@@ -190,44 +634,54 @@ class ChromaVectorDB:
         try:
             if not self.collection:
                 return False
-            all_docs = self.collection.get()
-
-            if all_docs["ids"]:
-                self.collection.delete(ids=all_docs["ids"])
-                st.success(f"Deleted {len(all_docs['ids'])} documents from ChromaDB")
-            else:
+            count = self.collection.count()
+            if not count:
                 st.info("No documents to delete")
+                return True
+
+            # Dropping and recreating the collection avoids loading every id
+            # into memory just to delete them
+            self.chroma_client.delete_collection(name=COLLECTION_NAME)
+            # Never keep a handle to the dropped collection, even if recreating fails
+            self.collection = None
+            self.collection = self._create_collection()
+            self.query_cache.clear()
 
+            st.success(f"Deleted {count} documents from ChromaDB")
             return True
 
         except Exception as e:
             st.error(f"Error clearing vector database: {str(e)}")
             return False
 
-    def get_documents_by_source(self, source_name: str) -> List[Dict[str, Any]]:
-        """Get all documents from a specific source"""
+    def iter_documents_by_source(
+        self, source_name: str, page_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield documents from a specific source, fetched one page at a time"""
         try:
             if not self.collection:
-                return []
-
-            results = self.collection.get(
-                where={"source_name": source_name}, include=["documents", "metadatas"]
-            )
+                return
+
+            offset = 0
+            while True:
+                results = self.collection.get(
+                    where={"source_name": source_name},
+                    limit=page_size,
+                    offset=offset,
+                    include=["documents", "metadatas"],
+                )
+                if not results["ids"]:
+                    break
 
-            documents = []
-            if results["documents"]:
-                for i, doc in enumerate(results["documents"]):
-                    documents.append(
-                        {
-                            "document": doc,
-                            "metadata": results["metadatas"][i]
-                            if results["metadatas"]
-                            else {},
-                        }
-                    )
+                metadatas = results["metadatas"] or [{}] * len(results["ids"])
+                for doc, metadata in zip(results["documents"], metadatas):
+                    yield {"document": doc, "metadata": metadata}
 
-            return documents
+                offset += page_size
 
         except Exception as e:
             st.error(f"Error retrieving documents by source: {str(e)}")
-            return []
+
+    def get_documents_by_source(self, source_name: str) -> List[Dict[str, Any]]:
+        """Get all documents from a specific source"""
+        return list(self.iter_documents_by_source(source_name))
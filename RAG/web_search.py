@@ -1,8 +1,41 @@
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 from typing import List, Dict, Any, Optional
-from config import SERPER_API_URL, DEFAULT_SEARCH_RESULTS
+from config import (
+    SERPER_API_URL,
+    DEFAULT_SEARCH_RESULTS,
+    WEB_SEARCH_TIMEOUT,
+    WEB_SEARCH_CACHE_TTL,
+)
+
+
+@st.cache_data(ttl=WEB_SEARCH_CACHE_TTL, show_spinner=False)
+def _serper_search(
+    _session: requests.Session, api_key: str, query: str, num_results: int
+) -> List[Dict[str, Any]]:
+    """Identical searches within the TTL reuse earlier results; errors raise
+    so they are never cached"""
+    response = _session.post(
+        SERPER_API_URL,
+        headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
+        data=json.dumps({"q": query, "num": num_results}),
+        timeout=WEB_SEARCH_TIMEOUT,
+    )
+    response.raise_for_status()
+
+    # Extract organic search results, never parsing more than were requested
+    return [
+        {
+            "title": result.get("title", ""),
+            "snippet": result.get("snippet", ""),
+            "link": result.get("link", ""),
+            "source": "web_search",
+        }
+        for result in response.json().get("organic", [])[:num_results]
+    ]
 
 
 class WebSearcher:
@@ -10,6 +43,22 @@ class WebSearcher:
         self.api_key = api_key
         self.enabled = api_key is not None
 
+        # Keep-alive connections are reused across searches instead of paying
+        # a TCP + TLS handshake per query. Searches are read-only, so POSTs
+        # are safe to retry on rate limits and transient server errors.
+        self.session = requests.Session()
+        retries = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries),
+        )
+
     def search(
         self, query: str, num_results: int = DEFAULT_SEARCH_RESULTS
     ) -> List[Dict[str, Any]]:
@@ -18,35 +67,11 @@ class WebSearcher:
             return []
 
         try:
-            payload = json.dumps({"q": query, "num": num_results})
-
-            headers = {
-                "X-API-KEY": self.api_key,
-                "Content-Type": "application/json",
-            }
+            return _serper_search(self.session, self.api_key, query, num_results)
 
-            response = requests.post(SERPER_API_URL, headers=headers, data=payload)
-
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-
-                # Extract organic search results
-                if "organic" in data:
-                    for result in data["organic"]:
-                        results.append(
-                            {
-                                "title": result.get("title", ""),
-                                "snippet": result.get("snippet", ""),
-                                "link": result.get("link", ""),
-                                "source": "web_search",
-                            }
-                        )
-
-                return results
-            else:
-                st.error(f"Web search failed with status: {response.status_code}")
-                return []
+        except requests.HTTPError as e:
+            st.error(f"Web search failed with status: {e.response.status_code}")
+            return []
 
         except Exception as e:
             st.error(f"Web search error: {str(e)}")
@@ -56,14 +81,13 @@ class WebSearcher:
         if not results:
             return ""
 
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            formatted_result = f"""
+        # One join over the formatted results sizes the output once
+        return "\n".join(
+            f"""
 Web Result {i}:
 Title: {result["title"]}
 Content: {result["snippet"]}
 Source: {result["link"]}
 """
-            formatted_results.append(formatted_result)
-
-        return "\n".join(formatted_results)
+            for i, result in enumerate(results, 1)
+        )
@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Final agent answers keyed by question embedding, persisted in SQLite
+
+    A lookup hits when a stored question's embedding has cosine similarity of
+    at least `threshold` with the new one, so re-running a demo with the same
+    (or a reworded) question skips the whole agent loop.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.95):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "question TEXT PRIMARY KEY, vec BLOB NOT NULL, answer TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Answer cache disabled =======> {str(e)}")
+            self._conn = None
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding: List[float]) -> Optional[str]:
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            rows = self._conn.execute("SELECT vec, answer FROM answers").fetchall()
+        if not rows:
+            return None
+
+        query = self._normalize(embedding)
+        matrix = np.stack([np.frombuffer(vec, dtype=np.float32) for vec, _ in rows])
+        if matrix.shape[1] != query.size:
+            return None
+
+        # Cosine similarity against every stored question in one product
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        return rows[best][1] if scores[best] >= self.threshold else None
+
+    def put(self, question: str, embedding: List[float], answer: str) -> None:
+        if self._conn is None:
+            return
+
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (question, vec, answer) VALUES (?, ?, ?)",
+                (question, vector.tobytes(), answer),
+            )
+            self._conn.commit()
@@ -0,0 +1,53 @@
+import ast
+import operator
+from functools import lru_cache
+
+# Powers are the one operator whose cost explodes with small input
+# (9**9**9**9 would never finish), so exponent and result size are capped
+_MAX_EXPONENT = 100
+_MAX_RESULT_BITS = 4096
+
+
+def _bounded_pow(base, exponent):
+    if abs(exponent) > _MAX_EXPONENT:
+        raise ValueError(f"Exponent too large: {exponent}")
+    if isinstance(base, int) and isinstance(exponent, int):
+        if base.bit_length() * exponent > _MAX_RESULT_BITS:
+            raise ValueError("Result too large")
+
+    # A negative base with a fractional exponent gives a complex number
+    result = operator.pow(base, exponent)
+    if isinstance(result, complex):
+        raise ValueError("Result is not a real number")
+    return result
+
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _bounded_pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _eval_node(node):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_eval_node(node.left), _eval_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_eval_node(node.operand))
+    raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=1024)
+def safe_eval(expression: str):
+    """Evaluate plain arithmetic only (no names, calls or attributes),
+    parsing each unique expression once. Shared by the agent_lab calculator
+    tools and, through gemini_lab/_calc.py, by tool_calling.py"""
+    return _eval_node(ast.parse(expression, mode="eval").body)
@@ -0,0 +1,16 @@
+import getpass
+import os
+
+from dotenv import load_dotenv
+
+# Imported by every agent_lab script; Python runs this body once per
+# process, so .env is read and the key prompt shown at most once
+load_dotenv()
+
+if "GEMINI_API_KEY" not in os.environ:
+    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
+# Langchain Google GenAI expects this env var or passed explicitly
+if "GOOGLE_API_KEY" not in os.environ:
+    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
+
+GEMINI_API_KEY = os.environ["GEMINI_API_KEY"]
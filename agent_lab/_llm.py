@@ -0,0 +1,30 @@
+from functools import lru_cache
+from typing import Optional
+
+from langchain_community.cache import SQLiteCache
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+
+@lru_cache(maxsize=1)
+def _get_cache() -> SQLiteCache:
+    """Local response cache, opened on first use so scripts that never ask
+    for a deterministic model don't create the database file"""
+    return SQLiteCache(database_path=".langchain.db")
+
+
+@lru_cache(maxsize=4)
+def get_llm(
+    model: str = "gemini-2.5-flash", temperature: Optional[float] = None
+) -> ChatGoogleGenerativeAI:
+    """Shared chat model per (model, temperature), so callers asking for the
+    same settings reuse one client and its warm connections"""
+    if temperature is None:
+        return ChatGoogleGenerativeAI(model=model, cache=False)
+
+    # Only deterministic models answer from the cache; caching sampled output
+    # would replay one random answer forever
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        cache=_get_cache() if temperature == 0 else False,
+    )
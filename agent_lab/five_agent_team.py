@@ -1,20 +1,14 @@
-import os
-import getpass
-from dotenv import load_dotenv
 from typing import TypedDict, Annotated, List, Dict
 import operator
 
 from langchain_core.messages import BaseMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END, START
+from pydantic import BaseModel, Field
 
-# Load environment variables
-load_dotenv()
+# Load environment variables and make sure the API key is set
+import _env  # noqa: F401
 
-if "GEMINI_API_KEY" not in os.environ:
-    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
+from _llm import get_llm
 
 # ==========================================
 # 1. Define State
@@ -30,29 +24,40 @@ class StoryState(TypedDict):
 # ==========================================
 # 2. Define Model
 # ==========================================
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+# Stories are meant to vary between runs, so this model samples and is never
+# answered from the response cache
+llm = get_llm("gemini-2.5-flash")
 
 # ==========================================
-# 3. Define 5 Agents (Nodes)
+# 3. Define Agents (Nodes)
 # ==========================================
 
-def director_node(state: StoryState):
-    print("\n🎬 DIRECTOR: Creating concept and outline...")
-    response = llm.invoke(f"Create a short story outline about: {state['topic']}. Provide a title and 3 bullet points for the plot.")
-    print(f"\n--- [OUTLINE] ---\n{response.content}\n-----------------")
-    return {"outline": response.content}
-
-def character_designer_node(state: StoryState):
-    print("\n👤 CHARACTER DESIGNER: Creating characters...")
-    response = llm.invoke(f"Based on this outline, create 2 main characters with names and brief personalities:\n{state['outline']}")
-    print(f"\n--- [CHARACTERS] ---\n{response.content}\n--------------------")
-    return {"characters": response.content}
-
-def world_builder_node(state: StoryState):
-    print("\n🌍 WORLD BUILDER: Designing the setting...")
-    response = llm.invoke(f"Based on this outline, describe the world/setting in 2 sentences:\n{state['outline']}")
-    print(f"\n--- [SETTING] ---\n{response.content}\n-----------------")
-    return {"world_setting": response.content}
+# The Director, Character Designer and World Builder all work from the same
+# topic, so one structured call produces the outline, characters and setting
+# together instead of three separate round-trips
+class Concept(BaseModel):
+    outline: str = Field(description="Story title and 3 bullet points for the plot")
+    characters: str = Field(description="2 main characters with names and brief personalities")
+    world_setting: str = Field(description="The world/setting in 2 sentences")
+
+concept_llm = llm.with_structured_output(Concept)
+
+def concept_node(state: StoryState):
+    print("\n🎬 DIRECTOR: Creating outline, characters and setting...")
+    concept = concept_llm.invoke(
+        f"Given the topic '{state['topic']}', produce: "
+        "(1) a short story outline with a title and 3 bullet points for the plot, "
+        "(2) 2 main characters with names and brief personalities, "
+        "(3) the world/setting in 2 sentences."
+    )
+    print(f"\n--- [OUTLINE] ---\n{concept.outline}\n-----------------")
+    print(f"\n--- [CHARACTERS] ---\n{concept.characters}\n--------------------")
+    print(f"\n--- [SETTING] ---\n{concept.world_setting}\n-----------------")
+    return {
+        "outline": concept.outline,
+        "characters": concept.characters,
+        "world_setting": concept.world_setting,
+    }
 
 def writer_node(state: StoryState):
     print("\n✍️ WRITER: Writing the story draft...")
@@ -82,28 +87,14 @@ def editor_node(state: StoryState):
 workflow = StateGraph(StoryState)
 
 # Add Nodes
-workflow.add_node("director", director_node)
-workflow.add_node("character_designer", character_designer_node)
-workflow.add_node("world_builder", world_builder_node)
+workflow.add_node("concept", concept_node)
 workflow.add_node("writer", writer_node)
 workflow.add_node("editor", editor_node)
 
-# Add Edges (Linear Flow)
-workflow.add_edge(START, "director")
-workflow.add_edge("director", "character_designer")
-workflow.add_edge("director", "world_builder") # Parallel?
-# Let's run Chracter and World in parallel after Director, then Writer waits for both.
-# LangGraph allows parallel branches.
-
-# Director -> Characters
-# Director -> World
-# But Writer needs BOTH.
-# In LangGraph, if we have parallel nodes, we need a way to join them.
-# Writer needs to wait for both. We can use a joining edge or just sequential for simplicity first.
-# Let's do Sequential for clear "communication" flow:
-# Director -> Character -> World -> Writer -> Editor
-workflow.add_edge("character_designer", "world_builder")
-workflow.add_edge("world_builder", "writer")
+# Add Edges
+# Concept (outline + characters + setting) -> Writer -> Editor
+workflow.add_edge(START, "concept")
+workflow.add_edge("concept", "writer")
 workflow.add_edge("writer", "editor")
 workflow.add_edge("editor", END)
 
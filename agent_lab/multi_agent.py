@@ -1,6 +1,3 @@
-import os
-import getpass
-from dotenv import load_dotenv
 from typing import Annotated, Sequence, TypedDict, Literal
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.tools import tool
@@ -9,14 +6,8 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
-# Load environment variables
-load_dotenv()
-
-# Ensure API key is set
-if "GEMINI_API_KEY" not in os.environ:
-    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
+# Load environment variables and make sure the API key is set
+import _env  # noqa: F401
 
 # ==========================================
 # 1. Define State
@@ -1,22 +1,17 @@
-import os
-import getpass
-from dotenv import load_dotenv
 from typing import List, Annotated
 import operator
 from typing_extensions import TypedDict
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END, START
 from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+from _calc import safe_eval
 
-# Load environment variables
-load_dotenv()
+# Load environment variables and make sure the API key is set
+import _env  # noqa: F401
 
-if "GEMINI_API_KEY" not in os.environ:
-    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
+from _llm import get_llm
 
 # ==========================================
 # 1. Define Tools
@@ -29,7 +24,10 @@ def search_tool(query: str):
 @tool
 def calculate_tool(expression: str):
     """Calculates a math expression."""
-    return f"Calculation result: {eval(expression)}"
+    try:
+        return f"Calculation result: {safe_eval(expression)}"
+    except Exception as e:
+        return f"Calculation error: {e}"
 
 tools = {
     "search": search_tool,
@@ -48,7 +46,14 @@ class PlannerState(TypedDict):
 # ==========================================
 # 3. Define Model
 # ==========================================
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+# Temperature 0 keeps plans deterministic, so re-running the demo is served
+# from the local response cache (see _llm.get_llm)
+llm = get_llm("gemini-2.5-flash", temperature=0)
+
+class PlanSchema(BaseModel):
+    remaining_steps: List[str] = Field(description="Remaining steps, empty if the objective is met")
+
+planner_llm = llm.with_structured_output(PlanSchema)
 
 # ==========================================
 # 4. Define Nodes
@@ -66,30 +71,11 @@ def planner_node(state: PlannerState):
     {past_steps}
     
     Create a list of remaining steps to achieve the objective.
-    Return ONLY a python list of strings, e.g., ["step 1", "step 2"].
-    If the objective is met, return an empty list [].
+    If the objective is met, return an empty list.
     """
     
-    # For robust parsing, we should use structured output or strict parsing.
-    # Here strictly prompting for a list string representation for simplicity in demo.
-    response = llm.invoke(prompt)
-    content = response.content.strip()
-    
-    # Basic cleanup to parse list
-    try:
-        if "[]" in content or "empty" in content.lower():
-            plan = []
-        else:
-            # Dangerous eval for demo, use with caution or regex
-            # Assuming model returns strictly ["a", "b"]
-            import ast
-            # cleaning markdown code blocks
-            if "```" in content:
-                content = content.split("```")[1].replace("python", "").replace("json", "").strip()
-            plan = ast.literal_eval(content)
-    except:
-        print(f"    Warning: Could not parse plan: {content}. Stopping.")
-        plan = []
+    # Structured output: Gemini returns JSON that Pydantic validates into a list
+    plan = planner_llm.invoke(prompt).remaining_steps
 
     print(f"    Remaining Plan: {plan}")
     return {"plan": plan}
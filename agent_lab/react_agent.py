@@ -1,47 +1,42 @@
-import os
-import getpass
-from dotenv import load_dotenv
+from types import MappingProxyType
 
-# Load environment variables
-load_dotenv()
+# Load environment variables and make sure the API key is set
+import _env  # noqa: F401
 
-# Ensure API key is set
-if "GEMINI_API_KEY" not in os.environ:
-    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
-# Langchain Google GenAI expects this env var or passed explicitly
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
-
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import tool
+from _calc import safe_eval
+from _llm import get_llm
 
 # 1. Define Tools
 @tool
 def calculator(expression: str) -> str:
     """Calculates the result of a mathematical expression."""
     try:
-        return str(eval(expression))
+        return str(safe_eval(expression))
     except Exception as e:
         return f"Error: {e}"
 
+# Mock data for demo purposes, built once and read-only
+_WEATHER = MappingProxyType({
+    "london": "Rainy, 15°C",
+    "new york": "Sunny, 22°C",
+    "tokyo": "Cloudy, 18°C",
+    "paris": "Sunny, 20°C"
+})
+
 @tool
 def get_weather(city: str) -> str:
     """Gets the current weather for a given city."""
-    # Mock data for demo purposes
-    weather_data = {
-        "london": "Rainy, 15°C",
-        "new york": "Sunny, 22°C",
-        "tokyo": "Cloudy, 18°C",
-        "paris": "Sunny, 20°C"
-    }
-    return weather_data.get(city.lower(), "Weather data not available for this city.")
+    return _WEATHER.get(city.lower(), "Weather data not available for this city.")
 
 tools = [calculator, get_weather]
 
 # 2. Initialize Model
 # We use gemini-2.5-flash for speed and tool calling capabilities
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+# Temperature 0 keeps answers deterministic, so re-running the fixed demo
+# queries is served from the local response cache
+llm = get_llm("gemini-2.5-flash", temperature=0)
 
 # 3. Create Agent
 # create_react_agent is a prebuilt helper that sets up the graph:
@@ -53,21 +48,33 @@ def run_demo(query: str):
     print(f"\nUser: {query}")
     print("-" * 50)
     
-    # helper to print streaming chunks
-    for chunk in agent_executor.stream({"messages": [("user", query)]}, stream_mode="values"):
-        # The last value in the stream is the final state
-        # We can inspect messages to see the thought process
-        messages = chunk["messages"]
-        last_message = messages[-1]
-        
+    # stream_mode="messages" yields each token as the model produces it,
+    # tagged with the graph node that produced it
+    answering = False
+    for chunk, metadata in agent_executor.stream({"messages": [("user", query)]}, stream_mode="messages"):
+        node = metadata["langgraph_node"]
+        tool_calls = getattr(chunk, "tool_calls", None)
+        is_answer_token = node == "agent" and chunk.content and not tool_calls
+
+        # End the streamed answer line before printing anything else
+        if answering and not is_answer_token:
+            print()
+            answering = False
+
         # Pretty print based on message type
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-            for tool_call in last_message.tool_calls:
+        if node == "agent" and tool_calls:
+            for tool_call in tool_calls:
                 print(f"🤖 Agent decides to call tool: {tool_call['name']} with args: {tool_call['args']}")
-        elif last_message.type == "tool":
-             print(f"🔧 Tool Output: {last_message.content}")
-        elif last_message.type == "ai":
-             print(f"💡 Agent: {last_message.content}")
+        elif node == "tools":
+             print(f"🔧 Tool Output: {chunk.content}")
+        elif is_answer_token:
+            if not answering:
+                print("💡 Agent: ", end="")
+                answering = True
+            print(chunk.content, end="", flush=True)
+
+    if answering:
+        print()
 
 if __name__ == "__main__":
     print("🤖 LangGraph ReAct Agent Demo")
@@ -1,21 +1,18 @@
+import asyncio
 import os
-import getpass
-from dotenv import load_dotenv
+import re
 from typing import List, Sequence
 from typing_extensions import TypedDict
 
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langgraph.graph import StateGraph, END, START
+from _answer_cache import SemanticAnswerCache
+from _llm import get_llm
 
-# Load environment variables
-load_dotenv()
-
-if "GEMINI_API_KEY" not in os.environ:
-    os.environ["GEMINI_API_KEY"] = getpass.getpass("Enter your Google API Key: ")
-if "GOOGLE_API_KEY" not in os.environ:
-    os.environ["GOOGLE_API_KEY"] = os.environ["GEMINI_API_KEY"]
+# Load environment variables and make sure the API key is set
+import _env  # noqa: F401
 
 # ==========================================
 # 1. Define State
@@ -28,97 +25,98 @@ class ReflexionState(TypedDict):
 # ==========================================
 # 2. Define Model
 # ==========================================
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash")
+# Both chains below share this one client
+llm = get_llm("gemini-2.5-flash")
 
 # ==========================================
 # 3. Define Prompts
 # ==========================================
-generation_prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert writer. Your goal is to write a high-quality, comprehensive answer to the user's question."),
+# The writer drafts and critiques in the same call, so each iteration is one
+# round-trip instead of a generate call followed by a reflect call. The
+# system prefix never changes, so it is rendered once at import and only the
+# history and critique are formatted on each iteration
+reflexion_prefix = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert writer and a harsh critic of your own work. Write a high-quality, comprehensive answer to the user's question, then review it for missing information, logical flaws, or areas for improvement.\n"
+               "Reply in exactly this format:\n<ANSWER>your answer</ANSWER>\n<CRITIQUE>a brief critique with suggestions, or PERFECT if nothing needs to change</CRITIQUE>"),
+]).format_messages()
+
+reflexion_tail = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="messages"),
-    ("user", "Critique from previous iteration (if any): {critique}. \nPlease provide your updated (or initial) answer.")
+    ("user", "Critique from previous iteration (if any): {critique}. \nPlease provide your updated (or initial) answer and its critique.")
 ])
 
-reflection_prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are a harsh critic. You review the user's answer and identify missing information, logical flaws, or areas for improvement."),
-    MessagesPlaceholder(variable_name="messages"),
-    ("user", "Review the last answer provided by the assistant above. Provide a brief critique and suggestions for improvement. If the answer is perfect, say 'PERFECT'.")
-])
-
-# Chains
-generate_chain = generation_prompt | llm
-reflect_chain = reflection_prompt | llm
+# Sampling settings are bound once here instead of being merged into the
+# request on every loop iteration
+reflexion_llm = llm.bind(generation_config={"temperature": 0.7})
 
 # ==========================================
 # 4. Define Nodes
 # ==========================================
-def generation_node(state: ReflexionState):
-    print(f"\n📝 GENERATOR (Iteration {state['iterations'] + 1})")
-    request = state["messages"][0] # Original Question
+_ANSWER_RE = re.compile(r"<ANSWER>(.*?)</ANSWER>", re.DOTALL)
+_CRITIQUE_RE = re.compile(r"<CRITIQUE>(.*?)</CRITIQUE>", re.DOTALL)
+
+async def stream_chain(runnable, inputs):
+    # Print tokens as they arrive and merge the chunks into one message, so
+    # output starts at the first token instead of after the full response
+    response = None
+    async for chunk in runnable.astream(inputs):
+        print(chunk.content, end="", flush=True)
+        response = chunk if response is None else response + chunk
+    print()
+    return response
+
+async def reflexion_node(state: ReflexionState):
+    print(f"\n📝 GENERATOR + 🤔 REFLECTOR (Iteration {state['iterations'] + 1})")
     
     # We pass the history context
-    response = generate_chain.invoke({
-        "messages": state["messages"], 
-        "critique": state.get("critique", "None")
-    })
+    response = await stream_chain(reflexion_llm, reflexion_prefix + reflexion_tail.format_messages(
+        messages=state["messages"],
+        critique=state.get("critique") or "None"
+    ))
     
-    print(f"   Draft: {response.content[:100]}...")
+    # If the model ignored the format, keep the whole reply as the draft and
+    # let the next iteration try again
+    text = response.content
+    answer = _ANSWER_RE.search(text)
+    critique = _CRITIQUE_RE.search(text)
     
-    # Return updated messages (append response) and increment iteration
+    # Only the draft goes into the history; the critique is fed back through
+    # the prompt variable
     return {
-        "messages": state["messages"] + [response],
+        "messages": state["messages"] + [AIMessage(content=answer.group(1).strip() if answer else text)],
+        "critique": critique.group(1).strip() if critique else "",
         "iterations": state["iterations"] + 1
     }
 
-def reflection_node(state: ReflexionState):
-    print(f"\n🤔 REFLECTOR")
-    # State messages now contains: [Using Question, ... , Latest Draft]
-    response = reflect_chain.invoke({"messages": state["messages"]})
-    
-    critique = response.content
-    print(f"   Critique: {critique}")
-    
-    return {"critique": critique}
-
 # ==========================================
 # 5. Define Routing
 # ==========================================
+# Whole word only, so a critique calling the draft "IMPERFECT" keeps looping
+_PERFECT_RE = re.compile(r"\bPERFECT\b")
+
 def should_continue(state: ReflexionState):
-    if state["iterations"] > 2:
-        print("\n🛑 Max iterations reached. Stopping.")
-        return END
-    
-    if "PERFECT" in state["critique"]:
+    if _PERFECT_RE.search(state["critique"]):
         print("\n✨ Critique is 'PERFECT'. Stopping.")
         return END
-        
-    return "reflect" # Go to reflector
-
-def should_loop(state: ReflexionState):
-    # After reflection, always go back to generate (unless we logic-ed out in should_continue, but that's on the edge from generate)
-    # Actually, standard flow: Generate -> Reflect -> Check -> (Generate or End)
-    # Let's adjust: Generate -> Check -> (Reflect -> Generate) or End
-    # But usually we check AFTER reflection because reflection decides if it's good.
     
-    # Let's use simpler graph: Generate -> Reflect -> Condition(End or Generate)
-    if "PERFECT" in state["critique"]:
+    if state["iterations"] > 2:
+        print("\n🛑 Max iterations reached. Stopping.")
         return END
-    return "generate"
+        
+    return "generate" # Revise the draft
 
 # ==========================================
 # 6. Build Graph
 # ==========================================
 workflow = StateGraph(ReflexionState)
 
-workflow.add_node("generate", generation_node)
-workflow.add_node("reflect", reflection_node)
+workflow.add_node("generate", reflexion_node)
 
 workflow.add_edge(START, "generate")
-workflow.add_edge("generate", "reflect")
 
 workflow.add_conditional_edges(
-    "reflect",
-    should_loop,
+    "generate",
+    should_continue,
     {
         END: END,
         "generate": "generate"
@@ -142,9 +140,41 @@ if __name__ == "__main__":
         "iterations": 0
     }
     
+    # Opt-in only: answers are sampled (temperature 0.7), so caching them by
+    # default would replay one draft forever and skip the loop this demo is
+    # meant to show. Set REFLEXION_ANSWER_CACHE=1 to serve a repeated (or
+    # reworded) question from answers kept in their own SQLite file
+    use_answer_cache = os.getenv("REFLEXION_ANSWER_CACHE") == "1"
+    if use_answer_cache:
+        answer_cache = SemanticAnswerCache(".reflexion_answers.db", threshold=0.95)
+        embeddings = GoogleGenerativeAIEmbeddings(model="models/text-embedding-004")
+    
     # Since we have a loop, we need to handle the output stream carefully
     # We'll just run it and let the nodes print
-    for event in app.stream(initial_state):
-        pass
+    async def main():
+        if use_answer_cache:
+            question_embedding = await embeddings.aembed_query(question)
+            cached = answer_cache.get(question_embedding)
+            if cached is not None:
+                print("\n⚡ Answer served from the semantic cache:\n")
+                print(cached)
+                return
+        
+        final = None
+        async for event in app.astream(initial_state):
+            final = event.get("generate", final)
+        
+        if use_answer_cache and final:
+            answer_cache.put(question, question_embedding, final["messages"][-1].content)
+
+    # uvloop is optional; the default asyncio loop works the same, just slower
+    # on socket reads. uvloop.run only affects this run, unlike the
+    # deprecated uvloop.install which swapped the global loop policy
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
         
     print("\n✅ Process Completed.")
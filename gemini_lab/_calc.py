@@ -0,0 +1,13 @@
+import importlib.util
+import os
+
+# The arithmetic evaluator lives once, in agent_lab/_calc.py. It is loaded by
+# path so the gemini_lab scripts stay runnable from their own directory
+_path = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "agent_lab", "_calc.py"
+)
+_spec = importlib.util.spec_from_file_location("_agent_lab_calc", _path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+safe_eval = _module.safe_eval
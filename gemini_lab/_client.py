@@ -0,0 +1,32 @@
+from google import genai
+from google.genai import types
+import httpx
+import importlib.util
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keep-alive pool limits, applied to both the sync and async (client.aio)
+# httpx clients
+_limits = httpx.Limits(
+    max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0
+)
+
+# The concurrent client.aio requests share one connection over HTTP/2 when
+# h2 is installed
+_http2 = importlib.util.find_spec("h2") is not None
+
+# One client for the lab scripts, so back-to-back requests reuse warm
+# connections instead of each paying a TCP + TLS handshake. google-genai
+# sends client.aio requests through aiohttp whenever it is installed (it is,
+# for the RAG app) and ignores async_client_args there, so the async side is
+# given its own httpx client to keep these limits on the gathered requests
+client = genai.Client(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    http_options=types.HttpOptions(
+        timeout=120_000,
+        client_args={"limits": _limits, "http2": _http2},
+        httpx_async_client=httpx.AsyncClient(limits=_limits, http2=_http2),
+    ),
+)
@@ -1,25 +1,41 @@
-from google import genai
+import asyncio
 from google.genai import types
 import json
-import os
-from dotenv import load_dotenv
+from _client import client
 import pydantic
 
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-
 prompt = """
 Extract the name, age, and city from this sentence:
 "John is 25 years old and lives in Berlin."
 Respond in JSON format.
 """
 
-response = client.models.generate_content(
-    model="gemini-2.5-flash",
-    contents=prompt,
-    config=types.GenerateContentConfig(response_mime_type="application/json")
-)
+class Person(pydantic.BaseModel):
+    name: str
+    age: int
+    city: str
+
+# Plain JSON mode and schema-constrained JSON are independent requests, so
+# both run concurrently
+async def main():
+    return await asyncio.gather(
+        client.aio.models.generate_content(
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(response_mime_type="application/json")
+        ),
+        client.aio.models.generate_content(
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=Person
+            )
+        ),
+    )
+
+response, schema_response = asyncio.run(main())
+
 print("Response======>", response)
 print(response.text)
 
@@ -30,24 +46,9 @@ except Exception as e:
     print("Failed to parse JSON:", e)
     print("Raw output:", response.text)
 
-
-class Person(pydantic.BaseModel):
-    name: str
-    age: int
-    city: str
-
-response = client.models.generate_content(
-    model="gemini-2.5-flash",
-    contents=prompt,
-    config=types.GenerateContentConfig(
-        response_mime_type="application/json",
-        response_schema=Person
-    )
-)
-
 try:
-    data = json.loads(response.text)
+    data = json.loads(schema_response.text)
     print("Parsed JSON with Schema:", data)
 except Exception as e:
     print("Failed to parse JSON:", e)
-    print("Raw output:", response.text)
+    print("Raw output:", schema_response.text)
@@ -1,11 +1,6 @@
-from google import genai
+import asyncio
 from google.genai import types
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from _client import client
 
 print("PROMPTING TECHNIQUES\n")
 print("=" * 60)
@@ -57,20 +52,33 @@ examples = {
     },
 }
 
-for method, data in examples.items():
+# The four techniques are independent, so their requests run concurrently
+# and the results are printed afterwards in order
+async def run_one(method, data, sem):
+    async with sem:
+        try:
+            response = await client.aio.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=data["prompt"],
+                config=types.GenerateContentConfig(max_output_tokens=2000)
+            )
+            return f"Model Response: {response.text}"
+        except Exception as e:
+            return f"Error: {e}"
+
+
+async def main():
+    sem = asyncio.Semaphore(4)
+    return await asyncio.gather(
+        *(run_one(method, data, sem) for method, data in examples.items())
+    )
+
+
+answers = asyncio.run(main())
+
+for (method, data), answer in zip(examples.items(), answers):
     print(f"Technique: {method.upper()}")
     print(f"Explanation: {data['explanation']}")
     print(f"Prompt: {data['prompt']}")
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=data["prompt"],
-            config=types.GenerateContentConfig(max_output_tokens=2000)
-        )
-        answer = response.text
-        print(f"Model Response: {answer}")
-    except Exception as e:
-        print(f"Error: {e}")
-    
+    print(answer)
     print("-" * 60)
@@ -1,11 +1,5 @@
-from google import genai
 from google.genai import types
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from _client import client
 
 chat = client.chats.create(
     model="gemini-2.5-flash",
@@ -1,11 +1,5 @@
 # Real-time token streaming
-from google import genai
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from _client import client
 
 response_stream = client.models.generate_content_stream(
     model="gemini-2.5-flash",